@@ -4,7 +4,9 @@ Naver 뉴스 수집 Provider - 공식 API 버전
 """
 import os
 import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional
 from datetime import datetime
 import html
@@ -29,6 +31,31 @@ class NaverNewsProvider(NewsProvider):
             )
         
         self.api_url = "https://openapi.naver.com/v1/search/news.json"
+        
+        # 세션 공유 (keep-alive로 종목/키워드마다 TCP+TLS 핸드셰이크 반복 방지)
+        # 여러 스레드에서 동시에 호출되므로 커넥션 풀을 넉넉하게 잡음
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+        self.session.headers.update({
+            "X-Naver-Client-Id": self.client_id,
+            "X-Naver-Client-Secret": self.client_secret,
+            "Accept-Encoding": "gzip, deflate"
+        })
+        
+        # API 호출 간격 제어 (여러 스레드가 공유, 초당 NAVER_NEWS_RPS회)
+        rps = max(0.1, float(os.getenv('NAVER_NEWS_RPS', '10')))
+        self._min_interval = 1.0 / rps
+        self._next_call_at = 0.0
+        self._rate_lock = threading.Lock()
+    
+    def _throttle(self):
+        """다음 호출 슬롯을 예약하고 그 시각까지 대기 (고정 sleep 대신 실제 호출 간격만 보장)"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait_time = self._next_call_at - now
+            self._next_call_at = max(now, self._next_call_at) + self._min_interval
+        if wait_time > 0:
+            time.sleep(wait_time)
     
     def fetch_news(self, ticker: str, stock_name: str, 
                    date: Optional[str] = None) -> List[Dict]:
@@ -68,9 +95,6 @@ class NaverNewsProvider(NewsProvider):
                         seen_urls.add(url)
                         news_items.append(item)
                 
-                # Rate limiting (네이버 API 권장) - 충분한 대기 시간 확보
-                time.sleep(0.5)
-                
                 # 충분한 뉴스를 수집했으면 중단
                 if len(news_items) >= self.max_items_per_ticker:
                     break
@@ -105,23 +129,17 @@ class NaverNewsProvider(NewsProvider):
         
         for attempt in range(max_retries):
             try:
-                # API 요청 헤더
-                headers = {
-                    "X-Naver-Client-Id": self.client_id,
-                    "X-Naver-Client-Secret": self.client_secret
-                }
-                
-                # API 요청 파라미터
+                # API 요청 파라미터 (인증 헤더는 세션에 설정됨)
                 params = {
                     "query": keyword,
                     "display": min(display, 100),  # 최대 100개
                     "sort": "date"  # 최신순 (또는 "sim" - 정확도순)
                 }
                 
-                # API 호출
-                response = requests.get(
+                # API 호출 (Rate limiting - 네이버 API 권장)
+                self._throttle()
+                response = self.session.get(
                     self.api_url,
-                    headers=headers,
                     params=params,
                     timeout=10
                 )
@@ -4,7 +4,8 @@
 import os
 import json
 import datetime as dt
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional
 import pandas as pd
 
 from hantubot.study.manager import run_daily_study, get_latest_trading_date
@@ -27,6 +28,110 @@ __all__ = [
     'generate_daily_retrospective'
 ]
 
+def _parse_trades(path: str) -> List[Dict]:
+    """매매 로그(JSONL) 파일을 읽어 거래 기록 리스트로 반환"""
+    trades = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                trades.append(json.loads(line))
+    return trades
+
+
+def _aggregate(trades: List[Dict]) -> Dict[str, Dict]:
+    """
+    거래 기록을 종목별로 집계 (I/O 없는 순수 함수)
+
+    Returns:
+        {symbol: {'avg_buy_price', 'avg_sell_price', 'has_sell', 'buy_reason', 'sell_reason'}, ...}
+    """
+    agg = {}
+    for trade in trades:
+        # 레코드 필드를 한 번만 꺼내서 지역 변수로 사용
+        symbol = trade.get('symbol')
+        if not symbol: continue
+        side = trade.get('side')
+        qty = trade.get('filled_quantity') or 0
+        price = trade.get('fill_price') or 0
+        reason = trade.get('reason')
+
+        info = agg.get(symbol)
+        if info is None:
+            info = agg[symbol] = {
+                'buy_qty': 0, 'buy_amt': 0, 'sell_qty': 0, 'sell_amt': 0,
+                'has_sell': False, 'buy_reason': "정보 없음", 'sell_reason': "정보 없음",
+            }
+
+        if side == 'buy':
+            info['buy_qty'] += qty
+            info['buy_amt'] += qty * price
+            if reason: info['buy_reason'] = reason
+        elif side == 'sell':
+            info['has_sell'] = True
+            info['sell_qty'] += qty
+            info['sell_amt'] += qty * price
+            if reason: info['sell_reason'] = reason
+
+    # 평균 단가 계산 (약식 수익률: 매도 평균가 / 매수 평균가 - 1)
+    for info in agg.values():
+        buy_qty = info.pop('buy_qty')
+        buy_amt = info.pop('buy_amt')
+        sell_qty = info.pop('sell_qty')
+        sell_amt = info.pop('sell_amt')
+        info['avg_buy_price'] = buy_amt / buy_qty if buy_qty > 0 else 0
+        info['avg_sell_price'] = sell_amt / sell_qty if sell_qty > 0 else 0
+    return agg
+
+
+def _render_markdown(agg: Dict[str, Dict], formatted_date: str) -> str:
+    """집계 결과를 오답노트 Markdown 문자열로 변환"""
+    report_lines = [f"# 📅 {formatted_date} 매매 복기\n"]
+
+    for i, (symbol, info) in enumerate(agg.items(), 1):
+        avg_buy_price = info['avg_buy_price']
+        avg_sell_price = info['avg_sell_price']
+
+        pnl_str = ""
+        if avg_buy_price > 0 and avg_sell_price > 0:
+            pnl = ((avg_sell_price / avg_buy_price) - 1) * 100
+            pnl_str = f"(수익: {pnl:+.2f}%)"
+        elif avg_buy_price > 0:
+             pnl_str = "(보유 중)"
+
+        # 종목명 가져오기 (API나 DB 필요하지만 여기선 생략하거나 trades에 포함되어 있다면 사용)
+        stock_name = symbol # 이름 정보가 없으면 코드로 대체
+
+        report_lines.append(f"### {i}. {stock_name} ({symbol}) {pnl_str}")
+        report_lines.append(f"- **매수 이유:** {info['buy_reason']}")
+        if info['has_sell']:
+            report_lines.append(f"- **매도 이유:** {info['sell_reason']}")
+
+        # 특이사항 (메모 등 - 현재는 공란)
+        report_lines.append("- **특이사항:** ")
+        report_lines.append("")
+
+    return "\n".join(report_lines)
+
+
+def _write(path: str, text: str):
+    """오답노트 파일 저장"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+@lru_cache(maxsize=8)
+def _render_report(path: str, mtime_ns: int, size: int, formatted_date: str) -> Optional[str]:
+    """
+    매매 로그 파일을 오답노트 Markdown으로 변환 (거래 내역이 없으면 None)
+
+    파일 mtime/size가 같으면 재파싱/재집계 없이 캐시된 문자열을 반환 (불변 값만 캐시)
+    """
+    trades = _parse_trades(path)
+    if not trades:
+        return None
+    return _render_markdown(_aggregate(trades), formatted_date)
+
+
 def generate_daily_retrospective(target_date: str = None):
     """
     당일 매매 내역을 분석하여 오답노트(Markdown)를 생성합니다.
@@ -47,85 +152,21 @@ def generate_daily_retrospective(target_date: str = None):
         logger.warning(f"매매 로그 파일이 없습니다: {trade_file}")
         return
 
-    trades = []
     try:
-        with open(trade_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    trades.append(json.loads(line))
+        st = os.stat(trade_file)
+        report_text = _render_report(trade_file, st.st_mtime_ns, st.st_size, formatted_date)
     except Exception as e:
         logger.error(f"매매 로그 파일 읽기 실패: {e}")
         return
 
-    if not trades:
+    if report_text is None:
         logger.info("매매 내역이 없습니다.")
         return
 
-    # 매매 내역 정리 (종목별 그룹화)
-    trades_by_symbol = {}
-    for trade in trades:
-        symbol = trade.get('symbol')
-        if not symbol: continue
-        if symbol not in trades_by_symbol:
-            trades_by_symbol[symbol] = []
-        trades_by_symbol[symbol].append(trade)
-
-    # Markdown 리포트 생성
-    report_lines = [f"# 📅 {formatted_date} 매매 복기\n"]
-    
-    for i, (symbol, symbol_trades) in enumerate(trades_by_symbol.items(), 1):
-        # 수익률 계산 (약식: 매도 평균가 / 매수 평균가 - 1)
-        buy_trades = [t for t in symbol_trades if t.get('side') == 'buy']
-        sell_trades = [t for t in symbol_trades if t.get('side') == 'sell']
-        
-        avg_buy_price = 0
-        avg_sell_price = 0
-        
-        if buy_trades:
-            total_qty = sum(t.get('filled_quantity', 0) for t in buy_trades)
-            total_amt = sum(t.get('filled_quantity', 0) * t.get('fill_price', 0) for t in buy_trades)
-            avg_buy_price = total_amt / total_qty if total_qty > 0 else 0
-            
-        if sell_trades:
-            total_qty = sum(t.get('filled_quantity', 0) for t in sell_trades)
-            total_amt = sum(t.get('filled_quantity', 0) * t.get('fill_price', 0) for t in sell_trades)
-            avg_sell_price = total_amt / total_qty if total_qty > 0 else 0
-            
-        pnl_str = ""
-        if avg_buy_price > 0 and avg_sell_price > 0:
-            pnl = ((avg_sell_price / avg_buy_price) - 1) * 100
-            pnl_str = f"(수익: {pnl:+.2f}%)"
-        elif avg_buy_price > 0:
-             pnl_str = "(보유 중)"
-        
-        # 종목명 가져오기 (API나 DB 필요하지만 여기선 생략하거나 trades에 포함되어 있다면 사용)
-        stock_name = symbol # 이름 정보가 없으면 코드로 대체
-        
-        report_lines.append(f"### {i}. {stock_name} ({symbol}) {pnl_str}")
-        
-        # 매수/매도 이유
-        buy_reason = "정보 없음"
-        sell_reason = "정보 없음"
-        
-        # trades 로그에 reason이 있다면 사용
-        for t in buy_trades:
-            if t.get('reason'): buy_reason = t.get('reason')
-        for t in sell_trades:
-            if t.get('reason'): sell_reason = t.get('reason')
-            
-        report_lines.append(f"- **매수 이유:** {buy_reason}")
-        if sell_trades:
-            report_lines.append(f"- **매도 이유:** {sell_reason}")
-        
-        # 특이사항 (메모 등 - 현재는 공란)
-        report_lines.append("- **특이사항:** ")
-        report_lines.append("")
-
     # 파일 저장
     output_file = os.path.join(log_dir, f"study_note_{target_date}.md")
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("\n".join(report_lines))
+        _write(output_file, report_text)
         logger.info(f"오답노트 저장 완료: {output_file}")
     except Exception as e:
         logger.error(f"오답노트 저장 실패: {e}")
@@ -1,18 +1,23 @@
 # hantubot_prod/hantubot/reporting/study.py
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
-import json
+from pathlib import Path
+from typing import Callable, List, Dict
 
 import gspread
+import numpy as np
 import pandas as pd
 from google.oauth2.service_account import Credentials
-from gspread_dataframe import set_with_dataframe
 from pykrx import stock
-import google.generativeai as genai  # 안정 버전 사용
 
 from .logger import get_logger
+from ..study.collector import get_ticker_name, get_derivative_tickers  # 프로세스 단위 캐시 공유
+from ..study.repository import get_study_db
+from ..utils.gemini_client import content_hash, ensure_gemini, get_gemini_model, iter_json_members, run_llm_batches, stream_text
+from ..utils.retry_decorator import retry_on_failure
+from ..utils.stock_filters import is_eligible_stock
 
 logger = get_logger(__name__)
 
@@ -24,64 +29,112 @@ GSHEET_SCOPE = [
 GSHEET_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'configs', 'google_service_account.json')
 GSHEET_NAME = "시장 관심주 추적"
 
+# 일시적 429/5xx로 전체 실행이 중단되지 않도록 Sheets 호출 재시도 (2초, 4초 백오프, Gemini는 stream_text에서 처리)
+_retry_gsheet = retry_on_failure(max_retries=3, delay=2.0, exceptions=(gspread.exceptions.APIError,))
+
 # --- Gemini API Functions (Batch Optimized) ---
-def get_batch_summaries_with_gemini(stocks_to_summarize: List[Dict]) -> Dict[str, str]:
+_COMPANY_SUMMARY_PROMPT = (
+    "아래 주식 종목들에 대해, 각각의 핵심 사업 내용을 한국어로 2~3 문장으로 요약해줘.\n"
+    "각 문장 끝에는 줄바꿈 문자(\\n)를 포함해서 가독성을 높여줘.\n"
+    "결과는 반드시 아래와 같은 JSON 형식으로 '종목코드': '요약' 형태로 제공해줘. 다른 설명은 모두 제외해줘.\n"
+    "```json\n"
+    "{\n"
+    '  "005930": "세계적인 종합 반도체 기업으로, 메모리 반도체와 시스템 LSI 사업을 영위함.\n스마트폰, TV, 가전제품 등 다양한 전자제품을 생산 및 판매하며 글로벌 IT 시장을 선도함.",\n'
+    '  "000660": "DRAM, 낸드플래시 등 메모리 반도체를 주력으로 생산하는 기업임.\n서버, 모바일, PC 등 다양한 IT 기기에 필수적인 부품을 공급하며 기술 경쟁력을 확보하고 있음."\n'
+    "}\n"
+    "```\n\n"
+    "요약할 종목 목록:\n"
+)
+# 종목 하나당 예상 문자 수 (목록 한 줄 + 2~3문장 요약이 담긴 JSON 응답)
+_COMPANY_SUMMARY_EST_CHARS = 250
+
+
+def _summarize_company_batch(model, batch: List[Dict]) -> Dict[str, str]:
+    """종목 묶음 하나를 Gemini로 요약해 {ticker: summary} 반환 (스트리밍 응답을 받는 대로 파싱)"""
+    stock_list_str = "\n".join([f"- {s['name']} ({s['ticker']})" for s in batch])
+    prompt = _COMPANY_SUMMARY_PROMPT + stock_list_str
+    
+    # 429/503 재시도는 stream_text가 첫 조각 전까지 처리
+    summaries = {}
+    try:
+        for ticker, summary in iter_json_members(stream_text(model, prompt)):
+            summaries[ticker] = summary
+    except Exception as e:
+        if not summaries:
+            raise
+        logger.warning(f"Gemini 응답 수신 중단 - 받은 {len(summaries)}개 요약만 사용: {e}")
+    
+    if not summaries:
+        logger.warning("Gemini 응답에서 JSON을 찾을 수 없습니다.")
+    return summaries
+
+
+def get_batch_summaries_with_gemini(stocks_to_summarize: List[Dict],
+                                    chunk_size: int = 20) -> Dict[str, str]:
     """
-    Uses the Gemini API to generate concise summaries for a batch of stocks in a single call.
+    Uses the Gemini API to generate concise summaries for a batch of stocks.
+    Stocks are split into chunks of `chunk_size` that are requested concurrently
+    (bounded by LLM_CONCURRENCY / GEMINI_RPM).
     Returns a dictionary mapping ticker to summary.
     """
     summaries = {stock['ticker']: "요약 생성 실패" for stock in stocks_to_summarize}
     
+    # 기업 개요는 뉴스와 무관하게 거의 바뀌지 않으므로 종목코드 기준으로 캐시 (COMPANY_SUMMARY_TTL_DAYS)
+    cache_db = None
+    hash_by_ticker = {stock['ticker']: content_hash('company', stock['ticker'], '') for stock in stocks_to_summarize}
+    try:
+        cache_db = get_study_db()
+        cached = cache_db.get_llm_cache(
+            list(hash_by_ticker.values()),
+            max_age_days=int(os.getenv('COMPANY_SUMMARY_TTL_DAYS', '30'))
+        )
+        for ticker, key in hash_by_ticker.items():
+            if key in cached:
+                summaries[ticker] = cached[key]
+        stocks_to_summarize = [s for s in stocks_to_summarize if hash_by_ticker[s['ticker']] not in cached]
+        if cached:
+            logger.info(f"기업 개요 {len(cached)}개 캐시 사용")
+    except Exception as e:
+        logger.warning(f"기업 개요 캐시 조회 실패 (전체 생성으로 진행): {e}")
+    
+    if not stocks_to_summarize:
+        return summaries
+    
     try:
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        # genai 설정/모델 인스턴스는 프로세스 단위로 재사용
+        if not ensure_gemini():
             logger.warning("GEMINI_API_KEY not found in .env file. Skipping summary.")
             return summaries
 
-        genai.configure(api_key=api_key)
         # 무료 티어에서 사용 가능한 최신 안정 모델
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        model = get_gemini_model('gemini-2.0-flash')
         
-        # Build a single prompt for all stocks
-        stock_list_str = "\n".join([f"- {s['name']} ({s['ticker']})" for s in stocks_to_summarize])
-        prompt = (
-            "아래 주식 종목들에 대해, 각각의 핵심 사업 내용을 한국어로 2~3 문장으로 요약해줘.\n"
-            "각 문장 끝에는 줄바꿈 문자(\\n)를 포함해서 가독성을 높여줘.\n"
-            "결과는 반드시 아래와 같은 JSON 형식으로 '종목코드': '요약' 형태로 제공해줘. 다른 설명은 모두 제외해줘.\n"
-            "```json\n"
-            "{\n"
-            '  "005930": "세계적인 종합 반도체 기업으로, 메모리 반도체와 시스템 LSI 사업을 영위함.\n스마트폰, TV, 가전제품 등 다양한 전자제품을 생산 및 판매하며 글로벌 IT 시장을 선도함.",\n'
-            '  "000660": "DRAM, 낸드플래시 등 메모리 반도체를 주력으로 생산하는 기업임.\n서버, 모바일, PC 등 다양한 IT 기기에 필수적인 부품을 공급하며 기술 경쟁력을 확보하고 있음."\n'
-            "}\n"
-            "```\n\n"
-            f"요약할 종목 목록:\n{stock_list_str}"
-        )
-        
-        response = model.generate_content(prompt)
-        
-        # Clean up and parse the JSON response
-        response_text = response.text.strip()
-        
-        # Remove markdown code blocks
-        response_text = response_text.replace("```json", "").replace("```", "").strip()
+        # 한 프롬프트에 전 종목을 넣으면 응답이 길어지고 한 번의 실패로 전부 잃으므로 나눠서 동시 호출
+        # 묶음 크기는 예상 프롬프트+응답 문자 수가 LLM_MAX_PROMPT_CHARS를 넘지 않도록 제한
+        max_chars = int(os.getenv('LLM_MAX_PROMPT_CHARS', '12000'))
+        chunk_size = max(1, min(chunk_size, (max_chars - len(_COMPANY_SUMMARY_PROMPT)) // _COMPANY_SUMMARY_EST_CHARS))
+        chunks = [stocks_to_summarize[i:i + chunk_size]
+                  for i in range(0, len(stocks_to_summarize), chunk_size)]
+        chunk_results = run_llm_batches(chunks, lambda batch: _summarize_company_batch(model, batch))
         
-        # Find JSON content (sometimes Gemini adds extra text)
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
-        
-        if start_idx != -1 and end_idx != -1:
-            json_text = response_text[start_idx:end_idx+1]
-            json_response = json.loads(json_text)
-            
-            # Gemini might return summaries for different tickers, so we update our dict safely
+        # Gemini might return summaries for different tickers, so we update our dict safely
+        new_cache = {}
+        for json_response in chunk_results:
+            if isinstance(json_response, Exception):
+                logger.error(f"Failed to get company summaries for a batch: {json_response}")
+                continue
             for ticker, summary in json_response.items():
                 if ticker in summaries:
                     summaries[ticker] = summary
-            
-            logger.info(f"Successfully generated summaries for {len(json_response)} stocks in a single batch call.")
-        else:
-            logger.warning("Gemini 응답에서 JSON을 찾을 수 없습니다.")
+                    new_cache[hash_by_ticker[ticker]] = summary
         
+        if cache_db is not None:
+            try:
+                cache_db.put_llm_cache(new_cache, 'gemini-2.0-flash')
+            except Exception as e:
+                logger.warning(f"기업 개요 캐시 저장 실패 (무시 가능): {e}")
+        
+        logger.info(f"Successfully generated summaries for {len(new_cache)} stocks in {len(chunks)} batch call(s).")
         return summaries
 
     except Exception as e:
@@ -97,6 +150,7 @@ def get_gsheet_client():
     creds = Credentials.from_service_account_file(GSHEET_CONFIG_PATH, scopes=GSHEET_SCOPE)
     return gspread.authorize(creds)
 
+@_retry_gsheet
 def get_worksheet_or_create(spreadsheet: gspread.Spreadsheet, name: str):
     """Get a worksheet by name, or create it if it doesn't exist."""
     try:
@@ -105,6 +159,61 @@ def get_worksheet_or_create(spreadsheet: gspread.Spreadsheet, name: str):
         logger.info(f"Worksheet '{name}' not found, creating it.")
         return spreadsheet.add_worksheet(title=name, rows=1, cols=1)
 
+def _auto_resize_request(ws: gspread.Worksheet, num_cols: int) -> Dict:
+    """batch_update용 열 너비 자동 조정 요청"""
+    return {
+        "autoResizeDimensions": {
+            "dimensions": {"sheetId": ws.id, "dimension": "COLUMNS", "startIndex": 0, "endIndex": num_cols}
+        }
+    }
+
+def _df_to_values(df: pd.DataFrame) -> List[List]:
+    """헤더 포함 2차원 리스트 (values API 전송용)"""
+    return [df.columns.tolist()] + df.values.tolist()
+
+# --- pykrx Snapshot Cache ---
+# 실행 위치(cwd)와 무관하게 프로젝트 루트의 data/cache 사용
+PYKRX_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / 'data' / 'cache'
+# 마지막으로 시트 저장까지 끝난 날짜 (같은 날 재실행 시 Sheets 조회 없이 종료)
+LAST_RUN_MARKER = PYKRX_CACHE_DIR / 'study_legacy_last_run'
+
+def _cached_pykrx(today_str: str, fn: Callable, suffix: str, max_age_sec: float = 1800) -> pd.DataFrame:
+    """
+    pykrx 전 종목 조회 결과를 data/cache에 날짜별로 저장해 재실행(force_run 등) 시 재사용
+    
+    장 마감 후(16시 이후) 저장된 스냅샷은 확정 데이터로 보고 계속 사용하고,
+    장중 스냅샷은 max_age_sec 동안만 사용합니다.
+    """
+    path = PYKRX_CACHE_DIR / f"{today_str}_{suffix}.pkl"
+    if path.exists():
+        mtime = path.stat().st_mtime
+        saved_at = datetime.fromtimestamp(mtime)
+        if saved_at.strftime("%Y%m%d") > today_str or saved_at.hour >= 16 or time.time() - mtime < max_age_sec:
+            try:
+                logger.info(f"pykrx 캐시 사용: {path}")
+                return pd.read_pickle(path)
+            except Exception as e:
+                logger.warning(f"pykrx 캐시 읽기 실패 (다시 조회): {e}")
+    
+    df = fn(today_str, market="ALL")
+    if not df.empty:
+        try:
+            PYKRX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            df.to_pickle(path)
+        except Exception as e:
+            logger.warning(f"pykrx 캐시 저장 실패 (무시 가능): {e}")
+    return df
+
+
+def _prune_pykrx_cache(keep_date: str):
+    """keep_date 이외 날짜의 pykrx 스냅샷 정리 (실행 완료 후 호출)"""
+    for old_file in PYKRX_CACHE_DIR.glob("*.pkl"):
+        if not old_file.name.startswith(f"{keep_date}_"):
+            try:
+                old_file.unlink()
+            except OSError as e:
+                logger.warning(f"pykrx 캐시 정리 실패 (무시 가능): {e}")
+
 # --- Main Study Logic ---
 def run_daily_study(broker, notifier, force_run=False):
     """
@@ -116,21 +225,36 @@ def run_daily_study(broker, notifier, force_run=False):
         force_run: True면 중복 체크 무시하고 강제 실행
     """
     logger.info("Running daily study: Fully Automated GSheet + Gemini Edition...")
-    today_str = datetime.now().strftime("%Y%m%d")
-    today_date_str_for_check = datetime.now().strftime("%Y-%m-%d")
+    now = datetime.now()
+    today_str = now.strftime("%Y%m%d")
+    today_date_str_for_check = now.strftime("%Y-%m-%d")
+
+    # 0. 로컬 실행 기록으로 먼저 확인 (네트워크 호출 없음)
+    if not force_run:
+        try:
+            if LAST_RUN_MARKER.read_text(encoding='utf-8').strip() == today_date_str_for_check:
+                logger.info(f"Today's study for {today_date_str_for_check} has already been completed (local marker). Skipping.")
+                return
+        except OSError:
+            pass
 
     # 1. Connect to Google Sheets and check for duplicates FIRST
     try:
         gsheet_client = get_gsheet_client()
-        spreadsheet = gsheet_client.open(GSHEET_NAME)
-        log_ws = get_worksheet_or_create(spreadsheet, "DailyLog")
+        spreadsheet = _retry_gsheet(gsheet_client.open)(GSHEET_NAME)
+        # 두 워크시트 조회와 날짜 열 조회를 동시에 진행 (HTTP 왕복 대기 시간 중첩)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            log_ws_future = executor.submit(get_worksheet_or_create, spreadsheet, "DailyLog")
+            freq_ws_future = executor.submit(get_worksheet_or_create, spreadsheet, "Frequency_Analysis")
+            log_ws = log_ws_future.result()
+            # 전체 이력 대신 날짜(A) 열만 받아서 중복 확인
+            dates_future = executor.submit(_retry_gsheet(log_ws.col_values), 1)
+            freq_ws = freq_ws_future.result()
+            logged_dates = dates_future.result()[1:]
         
-        existing_df = pd.DataFrame(log_ws.get_all_records())
-        if not force_run and not existing_df.empty and today_date_str_for_check in existing_df['날짜'].values:
+        if not force_run and today_date_str_for_check in logged_dates:
             logger.info(f"Today's study for {today_date_str_for_check} has already been completed. Skipping.")
             return
-
-        freq_ws = get_worksheet_or_create(spreadsheet, "Frequency_Analysis")
     except Exception as e:
         logger.error(f"Failed to connect to Google Sheets for pre-check: {e}", exc_info=True)
         notifier.send_alert(f"Google Sheets 연결 실패 (사전 확인): {e}", level='error')
@@ -138,22 +262,28 @@ def run_daily_study(broker, notifier, force_run=False):
 
     # 2. Fetch interesting stocks from pykrx
     try:
-        df_all = stock.get_market_ohlcv_by_ticker(today_str, market="ALL")
-        volume_filter = df_all['거래량'] >= 10_000_000
-        price_ceil_filter = df_all['등락률'] >= 29.0
-        interesting_tickers_df = df_all[volume_filter | price_ceil_filter]
+        df_all = _cached_pykrx(today_str, stock.get_market_ohlcv_by_ticker, "ohlcv")
+        # 필터 마스크는 ndarray로 바로 계산 (중간 bool Series 생성 생략)
+        mask = np.logical_or(df_all['거래량'].to_numpy() >= 10_000_000,
+                             df_all['등락률'].to_numpy() >= 29.0)
+        interesting_tickers_df = df_all[mask]
         
         if interesting_tickers_df.empty:
             logger.info("No stocks met the criteria for daily study today.")
             return
         
         # [수정] ETF, 스팩 등 제외 필터링 적용
-        from ..utils.stock_filters import is_eligible_stock
-        
-        unfiltered_tickers = interesting_tickers_df.index.tolist()
+        # ETF/ETN/ELW는 코드로 먼저 걸러서 종목명 조회 횟수 절감
+        excluded_tickers = get_derivative_tickers(today_str)
+        unfiltered_tickers = [
+            ticker for ticker in interesting_tickers_df.index.tolist()
+            if ticker not in excluded_tickers
+        ]
+        # 종목명은 종목당 한 번만 조회해서 필터/요약/기록 단계에서 재사용
+        names = {ticker: get_ticker_name(ticker) for ticker in unfiltered_tickers}
         interesting_tickers = [
             ticker for ticker in unfiltered_tickers 
-            if is_eligible_stock(stock.get_market_ticker_name(ticker))
+            if is_eligible_stock(names[ticker])
         ]
         
         if not interesting_tickers:
@@ -161,83 +291,105 @@ def run_daily_study(broker, notifier, force_run=False):
             return
             
         logger.info(f"필터링 후 데일리 스터디 대상 적격 종목 {len(interesting_tickers)}개 발견.")
-        df_funda = stock.get_market_fundamental_by_ticker(today_str)
     except Exception as e:
         logger.error(f"Failed to fetch stocks for daily study from pykrx: {e}", exc_info=True)
         return
 
     # 3. Get all summaries in one batch call
-    stocks_to_summarize = [{'ticker': t, 'name': stock.get_market_ticker_name(t)} for t in interesting_tickers]
+    stocks_to_summarize = [{'ticker': t, 'name': names[t]} for t in interesting_tickers]
     all_summaries = get_batch_summaries_with_gemini(stocks_to_summarize)
-    time.sleep(15) # Respect potential API rate limits after a large call
 
-    # 4. Process each stock and gather data
-    daily_records = []
-    for ticker in interesting_tickers:
-        try:
-            stock_info = interesting_tickers_df.loc[ticker]
-            stock_name = stock.get_market_ticker_name(ticker)
-            
-            company_summary = all_summaries.get(ticker, "요약 없음.")
-            
-            reason = ", ".join([r for r, c in [("거래량천만", stock_info['거래량'] >= 10_000_000), ("상한가", stock_info['등락률'] >= 29.0)] if c])
-
-            # 간소화된 컬럼 (재무지표 제외)
-            daily_records.append({
-                "날짜": today_date_str_for_check,
-                "종목코드": ticker,
-                "종목명": stock_name,
-                "선정사유": reason,
-                "종가": f"{stock_info['종가']:,}",
-                "등락률": f"{stock_info['등락률']:.2f}%",
-                "거래량": f"{stock_info['거래량']:,}",
-                "기업개요": company_summary,
-            })
-        except Exception as e:
-            logger.error(f"Failed to process {ticker} for GSheet: {e}")
+    # 4. Build records for all stocks at once (종목별 .loc/dict 대신 컬럼 단위로 DataFrame 구성)
+    records_df = pd.DataFrame()
+    try:
+        sub = interesting_tickers_df.loc[interesting_tickers, ['종가', '등락률', '거래량']]
+        volume_hit = (sub['거래량'] >= 10_000_000).to_numpy()
+        ceil_hit = (sub['등락률'] >= 29.0).to_numpy()
+        reason = np.select(
+            [volume_hit & ceil_hit, volume_hit, ceil_hit],
+            ['거래량천만, 상한가', '거래량천만', '상한가'],
+            default=''
+        )
+
+        # 간소화된 컬럼 (재무지표 제외)
+        records_df = pd.DataFrame({
+            "날짜": today_date_str_for_check,
+            "종목코드": sub.index.to_numpy(),
+            "종목명": sub.index.map(names).to_numpy(),
+            "선정사유": reason,
+            "종가": sub['종가'].astype('int64').map('{:,}'.format).to_numpy(),
+            "등락률": sub['등락률'].map('{:.2f}%'.format).to_numpy(),
+            "거래량": sub['거래량'].astype('int64').map('{:,}'.format).to_numpy(),
+            "기업개요": [all_summaries.get(ticker, "요약 없음.") for ticker in sub.index],
+        })
+    except Exception as e:
+        logger.error(f"Failed to build daily records for GSheet: {e}", exc_info=True)
 
-    if not daily_records:
+    if records_df.empty:
         logger.info("No records to update to Google Sheets.")
         return
         
     # 5. Update Google Sheets
     try:
-        new_df = pd.DataFrame(daily_records)
-        if not existing_df.empty:
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-        else:
-            combined_df = new_df
+        new_df = records_df
         
-        # Ensure all data is string to avoid gspread issues
-        combined_df = combined_df.astype(str)
-
-        set_with_dataframe(log_ws, combined_df, include_index=False, resize=True)
+        # DailyLog는 전체 이력을 다시 올리지 않고 오늘 행만 추가 (기존 헤더 순서에 맞춤, 값은 4단계에서 이미 문자열)
+        header = _retry_gsheet(log_ws.row_values)(1)
+        if header:
+            new_df = new_df.reindex(columns=header, fill_value='')
+            log_values = new_df.values.tolist()
+        else:
+            log_values = _df_to_values(new_df)
+        _retry_gsheet(log_ws.append_rows)(log_values, value_input_option='USER_ENTERED', insert_data_option='INSERT_ROWS')
         logger.info(f"Appended {len(new_df)} new records to 'DailyLog' worksheet.")
-        
-        # 자동 열 너비 조정 (내용에 맞게)
-        try:
-            # 모든 열에 대해 자동 크기 조정 요청
-            num_cols = len(combined_df.columns)
-            log_ws.columns_auto_resize(0, num_cols - 1)
-            logger.info("열 너비 자동 조정 완료.")
-        except Exception as e:
-            logger.warning(f"열 너비 자동 조정 실패 (무시 가능): {e}")
 
-        # Update Frequency Analysis using Korean column name
-        freq_counts = combined_df['종목명'].value_counts().reset_index()
-        freq_counts.columns = ['종목명', '등장횟수']
-        set_with_dataframe(freq_ws, freq_counts, include_index=False, resize=True)
+        # Update Frequency Analysis: 기존 집계에 오늘 등장분만 더해서 바뀐 행만 기록
+        freq_sheet = _retry_gsheet(freq_ws.get_values)('A1:B')
+        freq_rows = freq_sheet[1:]
+        row_of = {row[0]: i for i, row in enumerate(freq_rows, start=2) if row and row[0]}
+        counts = {row[0]: int(row[1]) if len(row) > 1 and str(row[1]).isdigit() else 0
+                  for row in freq_rows if row and row[0]}
+        today_counts = records_df['종목명'].value_counts()
+        
+        updates, appended = [], []
+        for stock_name, delta in today_counts.items():
+            total = counts.get(stock_name, 0) + int(delta)
+            if stock_name in row_of:
+                updates.append({'range': f"A{row_of[stock_name]}:B{row_of[stock_name]}", 'values': [[stock_name, total]]})
+            else:
+                appended.append([stock_name, total])
+        
+        if updates:
+            _retry_gsheet(freq_ws.batch_update)(updates, value_input_option='USER_ENTERED')
+        if appended:
+            if not freq_sheet:
+                appended.insert(0, ['종목명', '등장횟수'])
+            _retry_gsheet(freq_ws.append_rows)(appended, value_input_option='USER_ENTERED', insert_data_option='INSERT_ROWS')
         logger.info("Updated 'Frequency_Analysis' worksheet.")
         
-        # Frequency 시트도 자동 크기 조정
         try:
-            freq_ws.columns_auto_resize(0, 1)
-            logger.info("Frequency 시트 열 너비 자동 조정 완료.")
-        except Exception as e:
-            logger.warning(f"Frequency 시트 열 너비 자동 조정 실패 (무시 가능): {e}")
+            LAST_RUN_MARKER.parent.mkdir(parents=True, exist_ok=True)
+            LAST_RUN_MARKER.write_text(today_date_str_for_check, encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"실행 기록 저장 실패 (무시 가능): {e}")
+        _prune_pykrx_cache(today_str)
+        
+        # 자동 열 너비 조정은 시트에 처음 데이터를 쓴 실행에서만 (매일 요청 2회 절감)
+        resize_requests = []
+        if not header:
+            resize_requests.append(_auto_resize_request(log_ws, len(new_df.columns)))
+        if not freq_sheet:
+            resize_requests.append(_auto_resize_request(freq_ws, 2))
+        if resize_requests:
+            try:
+                spreadsheet.batch_update({"requests": resize_requests})
+                logger.info("열 너비 자동 조정 완료.")
+            except Exception as e:
+                logger.warning(f"열 너비 자동 조정 실패 (무시 가능): {e}")
 
-        summary_fields = [{"name": f"- {rec['종목명']} ({rec['종목코드']})", "value": f"이유: {rec['선정사유']}", "inline": False} for rec in daily_records[:5]]
-        embed = {"title": f"📝 유목민 공부법 리포트 -> GSheet 저장 완료", "description": f"금일의 관심 종목 **{len(daily_records)}개**가 자동 요약과 함께 Google Sheet에 저장되었습니다.", "color": 5814783, "fields": summary_fields}
+        top_rows = records_df[['종목명', '종목코드', '선정사유']].head(5).itertuples(index=False, name=None)
+        summary_fields = [{"name": f"- {name} ({ticker})", "value": f"이유: {reason}", "inline": False} for name, ticker, reason in top_rows]
+        embed = {"title": f"📝 유목민 공부법 리포트 -> GSheet 저장 완료", "description": f"금일의 관심 종목 **{len(records_df)}개**가 자동 요약과 함께 Google Sheet에 저장되었습니다.", "color": 5814783, "fields": summary_fields}
         notifier.send_alert("유목민 공부법 분석 완료", embed=embed)
 
     except Exception as e:
@@ -1,6 +1,8 @@
 # hantubot_prod/hantubot/reporting/trade_logger.py
 import os
 import json
+import atexit
+import threading
 from datetime import datetime
 from typing import Dict, Any
 
@@ -10,21 +12,45 @@ logger = get_logger(__name__)
 
 TRADE_LOG_DIR = os.path.join("reports", "trades") # 프로젝트 루트 기준
 
+# 공백 없는 JSON + 한글 그대로 저장 (체결마다 기록하므로 바이트 수 최소화)
+_encode_record = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
 def _get_trade_log_filepath() -> str:
     """오늘 날짜의 거래 기록 파일 경로를 반환합니다."""
     today_str = datetime.now().strftime("%Y-%m-%d")
     os.makedirs(TRADE_LOG_DIR, exist_ok=True) # 디렉토리가 없으면 생성
     return os.path.join(TRADE_LOG_DIR, f"trades_{today_str}.jsonl")
 
+# 프로세스 동안 열어 두는 당일 거래 기록 파일 (체결마다 open/close 반복 방지)
+_fh = None
+_fh_path = None
+_fh_lock = threading.Lock()
+
+def _close_trade_log():
+    """열려 있는 거래 기록 파일 닫기 (날짜 변경/프로세스 종료 시)"""
+    global _fh, _fh_path
+    if _fh is not None:
+        _fh.close()
+        _fh = None
+        _fh_path = None
+
+atexit.register(_close_trade_log)
+
 def log_trade_record(record: Dict[str, Any]):
     """
     거래 체결 기록을 JSON Lines 형식으로 파일에 추가합니다.
+    파일은 날짜가 바뀔 때까지 열어 두고, 줄 단위 버퍼링으로 기록마다 바로 반영합니다.
     :param record: 기록할 거래 정보 딕셔너리
     """
+    global _fh, _fh_path
     filepath = _get_trade_log_filepath()
     try:
-        with open(filepath, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        with _fh_lock:
+            if _fh_path != filepath:
+                _close_trade_log()
+                _fh = open(filepath, 'a', buffering=1, encoding='utf-8')
+                _fh_path = filepath
+            _fh.write(_encode_record(record) + '\n')
         logger.debug(f"거래 기록 저장됨: {record}")
     except Exception as e:
         logger.error(f"거래 기록 저장 중 오류 발생: {e}", exc_info=True)
@@ -2,18 +2,23 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 import os
-import json
+import logging
 
 from ..core.portfolio import Portfolio
 from ..reporting.logger import get_logger
 from ..execution.broker import Broker
 from ..core.clock import MarketClock
 from ..reporting.notifier import Notifier
+from ..utils.json_utils import loads_json
 
 logger = get_logger(__name__)
 
 DYNAMIC_PARAMS_FILE = os.path.join("configs", "dynamic_params.json")
 
+# 파싱된 dynamic_params.json 캐시 {(경로, mtime_ns): 전체 dict}
+# 전략마다 파일을 다시 읽지 않고, 파일이 수정되면(mtime 변경) 다시 로드
+_DYNAMIC_PARAMS_CACHE: Dict[tuple, Dict[str, Any]] = {}
+
 class BaseStrategy(ABC):
     """
     모든 자동매매 전략이 상속받아야 하는 추상 기본 클래스.
@@ -21,6 +26,9 @@ class BaseStrategy(ABC):
     """
     def __init__(self, strategy_id: str, config: Dict[str, Any], broker: Broker, clock: MarketClock, notifier: Notifier):
         self.strategy_id = strategy_id
+        # 이름/표현 문자열은 바뀌지 않으므로 한 번만 생성 (로그마다 재생성 방지)
+        self._name = type(self).__name__
+        self._repr = f"{self._name}(ID: {strategy_id})"
         self.config = config
         self.broker = broker
         self.clock = clock
@@ -29,10 +37,13 @@ class BaseStrategy(ABC):
         
         # 전역 설정 로드 (Engine에서 주입)
         self.global_config = config.get('_global', {})
+        # 매수 비율은 실행 중 바뀌지 않으므로 한 번만 조회 (기본값 0.93)
+        self._buy_ratio = float(self.global_config.get('risk_management', {}).get('buy_cash_ratio', 0.93))
         
         self._load_dynamic_params() # 동적 파라미터 로드
         
-        logger.info(f"Strategy '{self.name}' (ID: {self.strategy_id}) initialized with config: {self.config}, Dynamic: {self.dynamic_params}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Strategy '{self.name}' (ID: {self.strategy_id}) initialized with config: {self.config}, Dynamic: {self.dynamic_params}")
 
     def calculate_buy_quantity(self, current_price: float, available_cash: float) -> int:
         """
@@ -47,39 +58,41 @@ class BaseStrategy(ABC):
         """
         if current_price <= 0:
             return 0
-            
-        # 전역 설정에서 비율 가져오기 (기본값 0.93)
-        risk_mgmt = self.global_config.get('risk_management', {})
-        buy_ratio = risk_mgmt.get('buy_cash_ratio', 0.93)
-        
-        # 최대 주문 가능 금액 계산
-        order_amount = available_cash * buy_ratio
         
-        # 수량 계산 (소수점 버림)
-        quantity = int(order_amount // current_price)
-        
-        return quantity
+        # 최대 주문 가능 금액(가용 현금 * 매수 비율) 기준 수량 (소수점 버림)
+        return int((available_cash * self._buy_ratio) // current_price)
 
     def _load_dynamic_params(self):
         """
         configs/dynamic_params.json 파일에서 이 전략에 해당하는 동적 파라미터를 로드합니다.
         """
-        if os.path.exists(DYNAMIC_PARAMS_FILE):
-            try:
-                with open(DYNAMIC_PARAMS_FILE, 'r', encoding='utf-8') as f:
-                    all_dynamic_params = json.load(f)
-                    self.dynamic_params = all_dynamic_params.get(self.strategy_id, {})
-                    if self.dynamic_params:
-                        logger.info(f"전략 '{self.name}' (ID: {self.strategy_id})에 동적 파라미터 로드: {self.dynamic_params}")
-            except Exception as e:
-                logger.error(f"전략 '{self.name}' 동적 파라미터 로드 중 오류 발생: {e}", exc_info=True)
-        else:
+        try:
+            mtime_ns = os.stat(DYNAMIC_PARAMS_FILE).st_mtime_ns
+        except OSError:
             logger.debug(f"동적 파라미터 파일 {DYNAMIC_PARAMS_FILE}이(가) 존재하지 않습니다. 동적 파라미터를 로드하지 않습니다.")
+            return
+
+        try:
+            cache_key = (DYNAMIC_PARAMS_FILE, mtime_ns)
+            all_dynamic_params = _DYNAMIC_PARAMS_CACHE.get(cache_key)
+            if all_dynamic_params is None:
+                with open(DYNAMIC_PARAMS_FILE, 'rb') as f:
+                    raw = f.read()
+                all_dynamic_params = loads_json(raw)
+                # 이전 mtime의 항목은 더 이상 쓰이지 않으므로 최신 것만 유지
+                _DYNAMIC_PARAMS_CACHE.clear()
+                _DYNAMIC_PARAMS_CACHE[cache_key] = all_dynamic_params
+            # 인스턴스끼리 같은 dict를 공유하지 않도록 얕은 복사
+            self.dynamic_params = dict(all_dynamic_params.get(self.strategy_id, {}))
+            if self.dynamic_params:
+                logger.info(f"전략 '{self.name}' (ID: {self.strategy_id})에 동적 파라미터 로드: {self.dynamic_params}")
+        except Exception as e:
+            logger.error(f"전략 '{self.name}' 동적 파라미터 로드 중 오류 발생: {e}", exc_info=True)
 
     @property
     def name(self) -> str:
         """전략의 이름을 반환합니다."""
-        return self.__class__.__name__
+        return self._name
 
     @abstractmethod
     async def generate_signal(self, current_data: Dict[str, Any], portfolio: Portfolio) -> List[Dict[str, Any]]:
@@ -96,7 +109,7 @@ class BaseStrategy(ABC):
         pass
 
     def __str__(self):
-        return f"{self.name}(ID: {self.strategy_id})"
+        return self._repr
 
     def __repr__(self):
-        return self.__str__()
+        return self._repr
@@ -1,10 +1,15 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Union
+import numpy as np
 import pandas as pd
 import time
-from ta.trend import CCIIndicator
 from pykrx import stock  # 시장 지수 조회용
 from .config import ClosingPriceConfig
 
+try:
+    import talib  # C 구현 지표 (선택 의존성, 없으면 NumPy로 계산)
+except ImportError:
+    talib = None
+
 class ClosingPriceLogic:
     """
     [ClosingPriceLogic v6] Nomad Score V3 (Whale Radar)
@@ -37,14 +42,19 @@ class ClosingPriceLogic:
     
     def __init__(self, config: ClosingPriceConfig):
         self.config = config
+        self._trend_cache: Tuple[str, str] = ('', '')  # (조회 날짜, 'bull'/'bear') - 하루 한 번만 지수 조회
 
     def get_market_trend(self) -> str:
         """
         코스닥 시장 추세 판단 (pykrx 사용)
         Returns: 'bull' (20일선 위) or 'bear' (20일선 아래)
         """
+        today = time.strftime("%Y%m%d")
+        cached_date, cached_trend = self._trend_cache
+        if cached_date == today:
+            return cached_trend
+        
         try:
-            today = time.strftime("%Y%m%d")
             # 코스닥 지수 조회 (최근 60일)
             df_index = stock.get_index_ohlcv("20240101", today, "2001") # 2001: 코스닥
             if df_index is None or df_index.empty:
@@ -58,50 +68,61 @@ class ClosingPriceLogic:
             
             if pd.isna(last_ma20):
                 return 'bull'
-                
-            if last_close >= last_ma20:
-                return 'bull' # 상승장
             
-            return 'bear' # 하락장
+            # 상승장(bull) / 하락장(bear), 조회 실패 시의 기본값은 캐시하지 않고 다음 호출에서 재시도
+            trend = 'bull' if last_close >= last_ma20 else 'bear'
+            self._trend_cache = (today, trend)
+            return trend
             
         except Exception as e:
             return 'bull'
 
     def _calculate_cci(self, df: pd.DataFrame, period: int = 14) -> float:
-        """CCI 지표 계산"""
+        """CCI 지표 계산 (마지막 봉 값, 계산 불가 시 NaN)"""
         try:
             if df is None or len(df) < period:
-                return 0.0
-            cci_indicator = CCIIndicator(
-                high=df['stck_hgpr'], 
-                low=df['stck_lwpr'], 
-                close=df['stck_clpr'], 
-                window=period
-            )
-            return cci_indicator.cci().iloc[-1]
+                return float('nan')
+            high = df['stck_hgpr'].to_numpy(dtype=np.float64)
+            low = df['stck_lwpr'].to_numpy(dtype=np.float64)
+            close = df['stck_clpr'].to_numpy(dtype=np.float64)
+            
+            if talib is not None:
+                cci = talib.CCI(high, low, close, timeperiod=period)[-1]
+            else:
+                # 마지막 값만 필요하므로 최근 period개 봉의 Typical Price만으로 계산
+                # 평균편차가 0이면(가격 변동 없음) 기존 ta 구현처럼 값이 정의되지 않으므로 NaN
+                tp = (high[-period:] + low[-period:] + close[-period:]) / 3.0
+                sma = tp.mean()
+                mad = np.abs(tp - sma).mean()
+                cci = (tp[-1] - sma) / (0.015 * mad) if mad > 0 else float('nan')
+            return float(cci)
         except Exception:
-            return 0.0
+            return float('nan')
 
     def is_valid_candidate(self, df: pd.DataFrame, stock_info: Dict[str, Any] = None) -> Tuple[bool, str]:
         """Hard Filters 검증"""
         if df is None or len(df) < 20:
             return False, "데이터부족"
         try:
-            today = df.iloc[-1]
+            # 마지막 행은 Series(df.iloc[-1])로 만들지 않고 필요한 열의 스칼라만 꺼냄
+            closes = df['stck_clpr'].to_numpy(dtype=np.float64)
+            last_close = closes[-1]
+            last_volume = float(df['acml_vol'].iat[-1])
             if stock_info:
-                current_price = float(stock_info.get('stck_prpr', today['stck_clpr']))
-                trading_value = float(stock_info.get('acml_tr_pbmn', today['acml_vol'] * current_price))
+                current_price = float(stock_info.get('stck_prpr', last_close))
+                trading_value = float(stock_info.get('acml_tr_pbmn', last_volume * current_price))
             else:
-                current_price = float(today['stck_clpr'])
-                trading_value = float(today['acml_vol']) * current_price # 근사치
+                current_price = float(last_close)
+                trading_value = last_volume * current_price # 근사치
 
             # 1. 거래대금 1,000억 이상 (Strict)
             if trading_value < 100_000_000_000:
                 return False, f"대금미달({trading_value/100000000:.0f}억)"
 
             # 2. 추세: Price >= 20MA
-            sma20 = df['stck_clpr'].rolling(window=20).mean().iloc[-1]
-            if pd.isna(sma20): return False, "MA20계산불가"
+            # 마지막 값만 필요하므로 rolling 전체 대신 최근 20개 종가 평균
+            sma20 = closes[-20:].mean() if closes.size >= 20 else float('nan')
+            if np.isnan(sma20): return False, "MA20계산불가"
             if current_price < sma20:
                 return False, f"MA20이탈"
 
@@ -123,11 +144,14 @@ class ClosingPriceLogic:
         features = {}
         
         try:
-            today_candle = df.iloc[-1]
-            prev_candle = df.iloc[-2]
+            # 캔들 판정에 쓰는 오늘/전일 값은 행 Series 없이 스칼라로 한 번만 꺼냄
+            today_close = float(df['stck_clpr'].iat[-1])
+            prev_close = float(df['stck_clpr'].iat[-2])
+            today_low = float(df['stck_lwpr'].iat[-1])
+            today_high = float(df['stck_hgpr'].iat[-1])
             
-            current_price = float(stock_info.get('stck_prpr', today_candle['stck_clpr']))
-            volume = float(stock_info.get('acml_vol', today_candle['acml_vol']))
+            current_price = float(stock_info.get('stck_prpr', today_close))
+            volume = float(stock_info.get('acml_vol', df['acml_vol'].iat[-1]))
             
             # === A. Supply & Liquidity (Max 30pts) ===
             
@@ -154,8 +178,9 @@ class ClosingPriceLogic:
             # === B. Technical & Pattern (Max 30pts) ===
             
             # CCI(14)
+            # NaN이면 아래 구간 비교를 모두 통과하지 못해 가점 없음 (JSON 저장용 features에는 None으로 기록)
             cci_val = self._calculate_cci(df)
-            features['cci'] = cci_val
+            features['cci'] = None if np.isnan(cci_val) else cci_val
             
             if 150 <= cci_val <= 180:
                 score += 30
@@ -168,10 +193,7 @@ class ClosingPriceLogic:
                 details.append("CCI_Over(+10)")
 
             # Support (Low >= Prev Close) (+5)
-            prev_close = float(prev_candle['stck_clpr'])
-            low_price = float(today_candle['stck_lwpr'])
-            
-            if low_price >= prev_close:
+            if today_low >= prev_close:
                 score += 5
                 details.append("지지(+5)")
                 
@@ -209,8 +231,7 @@ class ClosingPriceLogic:
                 details.append("신고가근접(+10)")
                 
             # Strong Close (+10)
-            high_price = float(today_candle['stck_hgpr'])
-            if current_price == high_price:
+            if current_price == today_high:
                 score += 10
                 details.append("종가고가(+10)")
 
@@ -248,51 +269,48 @@ class ClosingPriceLogic:
         else:
             return "❓ 등급 없음: 상황에 따라 대응하세요."
 
-    def filter_and_rank(self, candidates: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str]:
+    def filter_and_rank(self, candidates: Union[pd.DataFrame, List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], str]:
         """
         최종 랭킹 및 섹터 보너스 적용
+        
+        candidates는 후보별 채점 결과 DataFrame(행=종목, 열=결과 키)을 기본으로 받고,
+        dict 리스트도 허용. 반환값(상위 3개)은 기존과 같은 dict 리스트.
         """
-        # [Step 1] 주도 섹터 보너스 적용 (Check if 2+ stocks in same industry have >10% rise)
+        df = candidates.copy() if isinstance(candidates, pd.DataFrame) else pd.DataFrame(candidates)
+        if df.empty:
+            return [], "없음"
+        
+        # 일부 후보에만 있는 키는 DataFrame에서 NaN이 되므로 기존 dict.get 기본값으로 채움
+        df = df.reset_index(drop=True)
+        df['sector'] = df['sector'].fillna('Unknown') if 'sector' in df.columns else 'Unknown'
+        df['score'] = df['score'].fillna(0) if 'score' in df.columns else 0
+        df['reason'] = df['reason'].fillna('') if 'reason' in df.columns else ''
+        features = df['features'] if 'features' in df.columns else pd.Series([{}] * len(df))
+        change_rate = features.map(lambda f: f.get('change_rate', 0) if isinstance(f, dict) else 0)
+        
+        # [Step 1] 주도 섹터 보너스 적용 (같은 섹터에서 10% 이상 상승 종목이 2개 이상)
         # candidates must have 'sector' and 'change_rate'
+        known_sector = df['sector'] != 'Unknown'
+        risers = known_sector & (change_rate >= 10.0)
+        sector_risers = risers.groupby(df['sector'], dropna=False).transform('sum')
+        leader = known_sector & (sector_risers >= 2)
         
-        sector_risers = {} # Sector -> Count of >10% risers
-        for c in candidates:
-            sector = c.get('sector', 'Unknown')
-            change_rate = c.get('features', {}).get('change_rate', 0)
-            
-            if sector != 'Unknown' and change_rate >= 10.0:
-                sector_risers[sector] = sector_risers.get(sector, 0) + 1
-                
-        # Apply Bonus
-        for c in candidates:
-            sector = c.get('sector', 'Unknown')
-            if sector != 'Unknown' and sector_risers.get(sector, 0) >= 2:
-                c['score'] += 10
-                if c.get('reason'):
-                    c['reason'] += " + 주도섹터(+10)"
-                else:
-                    c['reason'] = "주도섹터(+10)"
+        df.loc[leader, 'score'] += 10
+        reason = df.loc[leader, 'reason'].astype(str)
+        df.loc[leader, 'reason'] = reason.where(reason == '', reason + " + ").add("주도섹터(+10)")
         
-        # [Step 2] 등급 분류 (S:90, A:80, B:70)
-        final_list = []
-        for c in candidates:
-            score = c.get('score', 0)
-            
-            if score >= 90:
-                c['grade'] = "S-Class"
-                final_list.append(c)
-            elif score >= 80:
-                c['grade'] = "A-Class"
-                final_list.append(c)
-            elif score >= 70:
-                c['grade'] = "B-Class"
-                final_list.append(c)
-            # < 70 Discard
+        # [Step 2] 등급 분류 (S:90, A:80, B:70, 70 미만 제외) 후 점수순 상위 3개
+        top = df[df['score'] >= 70].nlargest(3, 'score')
+        if top.empty:
+            return [], "없음"
         
-        final_list.sort(key=lambda x: x['score'], reverse=True)
+        top['grade'] = np.select(
+            [top['score'] >= 90, top['score'] >= 80],
+            ["S-Class", "A-Class"],
+            default="B-Class"
+        )
         
-        # Return Top 3
-        if final_list:
-            return final_list[:3], "Nomad V3"
-            
-        return [], "없음"
+        # Return Top 3 (외부 호출부와의 경계에서만 dict로 변환)
+        # 그 밖에 비어 있는 값(NaN)은 None으로 바꿔 JSON 저장 시 null로 기록
+        top = top.astype(object).where(top.notna(), None)
+        return top.to_dict('records'), "Nomad V3"
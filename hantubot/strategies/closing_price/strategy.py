@@ -1,3 +1,4 @@
+import asyncio
 import datetime as dt
 import json
 import os
@@ -5,7 +6,6 @@ import time
 from typing import Dict, List, Any
 import pandas as pd
 from pykrx import stock
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ...strategies.base_strategy import BaseStrategy
 from ...core.portfolio import Portfolio
@@ -51,7 +51,8 @@ class ClosingPriceStrategy(BaseStrategy):
             # 1. 파일 저장 (기존 유지)
             file_path = self._get_screening_file_path()
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.top_stocks_today, f, ensure_ascii=False, indent=2)
+                # NaN은 표준 JSON이 아니므로 기록하지 않고 저장 실패로 처리
+                json.dump(self.top_stocks_today, f, ensure_ascii=False, indent=2, allow_nan=False)
             logger.info(f"[{self.name}] 💾 스크리닝 결과 파일 저장 완료")
             
             # 2. DB 저장 (추가)
@@ -158,13 +159,14 @@ class ClosingPriceStrategy(BaseStrategy):
                     pass
             
             # Shares Outstanding (Pykrx)
-            # Needed for Turnover Ratio
-            try:
-                cap_df = stock.get_market_cap_by_date(today_str, today_str, ticker)
-                if not cap_df.empty:
-                    stock_info['lstn_stcn'] = cap_df.iloc[-1]['상장주식수']
-            except Exception:
-                pass
+            # Needed for Turnover Ratio (보통 _perform_screening에서 전 종목 일괄 조회로 채워짐)
+            if not float(stock_info.get('lstn_stcn', 0) or 0):
+                try:
+                    cap_df = stock.get_market_cap_by_date(today_str, today_str, ticker)
+                    if not cap_df.empty:
+                        stock_info['lstn_stcn'] = cap_df.iloc[-1]['상장주식수']
+                except Exception:
+                    pass
 
             # 4. Filter Check (Nomad V3 Hard Filters)
             is_valid, validation_reason = self.logic.is_valid_candidate(df, stock_info)
@@ -199,9 +201,18 @@ class ClosingPriceStrategy(BaseStrategy):
             
         return result
 
+    def _get_listed_shares(self, date_str: str) -> Dict[str, Any]:
+        """전 종목 상장주식수 일괄 조회 (종목별 pykrx 호출 대체, 실패 시 빈 dict)"""
+        try:
+            cap_df = stock.get_market_cap_by_ticker(date_str)
+            if cap_df is not None and not cap_df.empty and '상장주식수' in cap_df.columns:
+                return cap_df['상장주식수'].to_dict()
+        except Exception as e:
+            logger.warning(f"[{self.name}] 상장주식수 일괄 조회 실패 (종목별 조회로 대체): {e}")
+        return {}
+
     async def _perform_screening(self, data_payload: Dict[str, Any], top_volume_stocks: List[Dict]) -> List[Dict[str, Any]]:
         """스크리닝 실행 (공통 로직)"""
-        candidates = []
         min_trading_value_cutoff = 100_000_000_000 # 1000억 (사전 필터링)
         
         market_trend = self.logic.get_market_trend()
@@ -218,17 +229,29 @@ class ClosingPriceStrategy(BaseStrategy):
             
             if ticker: targets.append((ticker, stock_data))
 
-        # ThreadPoolExecutor로 병렬 스코어링
-        with ThreadPoolExecutor(max_workers=5) as executor: # pykrx 호출 빈도 고려하여 워커 줄임
-            future_to_info = {
-                executor.submit(self.calculate_score, ticker, stock_info, data_payload, market_trend): ticker
-                for ticker, stock_info in targets
-            }
-            for future in as_completed(future_to_info):
-                try:
-                    res = future.result()
-                    if res.get('valid'): candidates.append(res)
-                except Exception: pass
+        # 상장주식수(회전율 계산용)는 전 종목을 한 번에 조회해 주입
+        today_str = dt.datetime.now().strftime("%Y%m%d")
+        listed_shares = await asyncio.to_thread(self._get_listed_shares, today_str)
+        for ticker, stock_info in targets:
+            if ticker in listed_shares:
+                stock_info['lstn_stcn'] = listed_shares[ticker]
+
+        # 세마포어로 동시 실행 수를 제한하며 병렬 스코어링 (이벤트 루프는 막지 않음)
+        sem = asyncio.Semaphore(5)  # pykrx 호출 빈도 고려하여 동시 실행 수 제한
+
+        async def score_one(ticker, stock_info):
+            async with sem:
+                return await asyncio.to_thread(self.calculate_score, ticker, stock_info, data_payload, market_trend)
+
+        results = await asyncio.gather(
+            *(score_one(ticker, stock_info) for ticker, stock_info in targets),
+            return_exceptions=True
+        )
+        # 유효 후보는 열 단위 DataFrame 하나로 모아 랭킹 단계에 전달
+        candidates = pd.DataFrame([
+            res for res in results
+            if not isinstance(res, BaseException) and res.get('valid')
+        ])
 
         # 최종 랭킹 및 등급 산정 (섹터 보너스 포함)
         selected_stocks, selection_type = self.logic.filter_and_rank(candidates)
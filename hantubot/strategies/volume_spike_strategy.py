@@ -12,6 +12,13 @@ from ..providers.naver_news import NaverNewsProvider
 
 logger = get_logger(__name__)
 
+
+def _fast_good_candle(o: float, h: float, l: float, c: float) -> bool:
+    """양봉이면서 윗꼬리(고가-종가)가 몸통의 2배 이하인지 분기 없이 판정 (NumPy 배열도 그대로 받음)"""
+    body = c - o
+    return (body > 0.0) & (h - c <= 2.0 * body)
+
+
 class VolumeSpikeStrategy(BaseStrategy):
     """
     급등주 포착 전략 (유목민 철학 적용)
@@ -185,7 +192,7 @@ class VolumeSpikeStrategy(BaseStrategy):
                             if not hist_data or len(hist_data) < 20: continue
                             
                             df = pd.DataFrame(hist_data)
-                            for col in ['stck_clpr', 'stck_oprc', 'stck_hgpr', 'acml_vol']:
+                            for col in ['stck_clpr', 'stck_oprc', 'stck_hgpr', 'stck_lwpr', 'acml_vol']:
                                 if col in df.columns:
                                     df[col] = pd.to_numeric(df[col], errors='coerce')
                             
@@ -199,14 +206,12 @@ class VolumeSpikeStrategy(BaseStrategy):
                             current_price = float(today_candle['stck_clpr'])
                             open_price = float(today_candle['stck_oprc'])
                             high_price = float(today_candle['stck_hgpr'])
+                            low_price = float(today_candle['stck_lwpr'])
                             
                             # A. 캔들 패턴 필터
-                            # 양봉 필수
-                            if current_price <= open_price: continue
-                            # 윗꼬리 제한 (High - Close) <= (Close - Open) * 2
-                            upper_shadow = high_price - current_price
-                            body = current_price - open_price
-                            if body > 0 and upper_shadow > body * 2: continue
+                            # 양봉 필수 + 윗꼬리 제한 (High - Close) <= (Close - Open) * 2
+                            if not _fast_good_candle(open_price, high_price, low_price, current_price):
+                                continue
 
                             # B. 거래량 분석 필터
                             # 당일 거래량 > 전일 거래량 * 2 (200% 이상 급증)
@@ -2,18 +2,128 @@
 LLM 기반 뉴스 요약 및 학습 메모 생성 모듈
 """
 import os
-import time
 import json
-from typing import List, Dict
-
-import google.generativeai as genai
+import re
+from typing import List, Dict, Optional
 
 from datetime import datetime, timedelta
 from hantubot.reporting.logger import get_logger
 from hantubot.study.repository import StudyDatabase, get_study_db
+from hantubot.utils.gemini_client import (
+    content_hash, ensure_gemini, get_gemini_model, iter_json_members, run_llm_batches, stream_text
+)
+from hantubot.utils.json_utils import loads_json
 
 logger = get_logger(__name__)
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 프롬프트 고정부 (배치마다 종목 섹션만 이어 붙임)
+_STUDY_NOTE_PREFIX = """당신은 "주식 공부용 학습 메모"를 작성하는 AI입니다. 
+아래 종목들에 대해 뉴스를 분석하고, 각 종목마다 다음 형식의 JSON을 생성하세요:
+
+**백일공부 원칙:**
+1. 사실만 추출 (추측/예측 금지)
+2. 여러 기사에서 공통으로 반복되는 내용만 요약
+3. 학습 메모는 "이 종목에서 배울 점"을 일반화된 문장으로 작성
+4. 신뢰도 평가: high(3개 이상 기사 일치), mid(2개 기사 일치), low(단일 기사 또는 불명확)
+
+**출력 형식 (JSON):**
+```json
+{
+  "종목코드": {
+    "factual_summary": "여러 기사에서 공통으로 언급된 사실만 2-3문장으로 요약. 단일 기사 주장은 제외.",
+    "ai_learning_note": "이 종목에서 배울 수 있는 일반화된 교훈. 특정 종목명 언급 금지. 다음에 비슷한 패턴을 만났을 때 체크할 조건 포함. 감정/예측/권유 금지.",
+    "ai_confidence": "high 또는 mid 또는 low",
+    "verification_status": "기사 간 내용 일치 여부 또는 '확인 필요' 메시지"
+  }
+}
+```
+
+**예시:**
+```json
+{
+  "123456": {
+    "factual_summary": "복수의 언론사가 A사와의 계약 체결을 보도. 계약 규모는 100억원으로 일치.",
+    "ai_learning_note": "주요 고객사와의 대규모 계약 체결 시 단기 급등 가능성. 계약 규모, 고객사 신뢰도, 기존 매출 대비 비중 확인 필요.",
+    "ai_confidence": "high",
+    "verification_status": "3개 언론사 보도 내용 일치"
+  }
+}
+```
+
+**분석할 종목:**
+"""
+_STUDY_NOTE_SUFFIX = """
+**중요:** JSON만 출력하세요. 다른 설명은 불필요합니다.
+"""
+
+_SUMMARY_PREFIX = """아래 종목들을 **수집된 뉴스 내용만을 근거로** 요약하세요.
+
+**중요:**
+- 뉴스가 없으면 "관련 뉴스 없음"이라고만 적으세요
+- 추측하지 말고 뉴스에 명시된 사실만 요약
+- 각 종목당 2-4문장
+
+**출력 형식 (JSON):**
+```json
+{
+  "종목코드": "뉴스 기반 요약 내용"
+}
+```
+
+**종목 및 뉴스:**
+"""
+_SUMMARY_SUFFIX = """
+**JSON만 출력:**
+"""
+
+def _dedup_news(news_items: List[Dict], max_n: int = 10, snippet_len: int = 180) -> List[Dict]:
+    """
+    LLM 프롬프트용 뉴스 정리 (입력 토큰 절감)
+    
+    - 공백 제거·소문자화한 제목 앞 48자가 같으면 중복으로 보고 첫 기사만 유지
+    - snippet은 snippet_len자로 자르고, 최대 max_n개만 반환
+    """
+    seen = set()
+    deduped = []
+    for news in news_items:
+        key = _WHITESPACE_RE.sub('', news['title'].lower())[:48]
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append({**news, 'snippet': (news.get('snippet') or '')[:snippet_len]})
+        if len(deduped) >= max_n:
+            break
+    return deduped
+
+
+def _pack_batches(stocks: List[Dict], news_map: Dict[str, List[Dict]], max_items: int,
+                  max_news: int, snippet_len: int = 180) -> List[List[Dict]]:
+    """
+    프롬프트 크기 기준으로 종목을 배치에 채움
+    
+    종목 수(max_items)와 예상 뉴스 문자 수(LLM_MAX_PROMPT_CHARS) 중 먼저 닿는 쪽에서
+    배치를 나눔 (뉴스가 많은 종목끼리 한 프롬프트에 몰려 응답이 느려지는 것 방지)
+    """
+    max_chars = int(os.getenv('LLM_MAX_PROMPT_CHARS', '12000'))
+    batches = []
+    current: List[Dict] = []
+    current_chars = 0
+    for stock in stocks:
+        est_chars = sum(
+            len(news['title']) + min(len(news.get('snippet') or ''), snippet_len) + 16
+            for news in news_map.get(stock['ticker'], [])[:max_news]
+        )
+        if current and (len(current) >= max_items or current_chars + est_chars > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(stock)
+        current_chars += est_chars
+    if current:
+        batches.append(current)
+    return batches
+
 
 class StudyAnalyzer:
     """
@@ -147,8 +257,7 @@ def generate_summaries(run_date: str, candidates: List[Dict],
     Returns:
         {'success_count': int, 'failed_count': int, 'errors': []}
     """
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
+    if not ensure_gemini():
         logger.warning("GEMINI_API_KEY not found. Skipping summaries.")
         return {'success_count': 0, 'failed_count': 0, 'errors': ['No API key']}
     
@@ -156,59 +265,56 @@ def generate_summaries(run_date: str, candidates: List[Dict],
     failed_count = 0
     errors = []
     
-    # 요약이 필요한 종목만 필터링 (캐싱)
-    stocks_to_summarize = []
-    for candidate in candidates:
-        ticker = candidate['ticker']
-        
-        # 이미 요약이 있는지 확인
-        if db.has_summary(run_date, ticker):
-            logger.debug(f"Summary already exists for {ticker}, skipping")
-            continue
-        
-        stocks_to_summarize.append({
-            'ticker': ticker,
-            'name': candidate['name']
-        })
+    # 요약이 필요한 종목만 필터링 (이미 요약된 종목은 쿼리 한 번으로 확인)
+    summarized_tickers = db.existing_summary_tickers(run_date)
+    stocks_to_summarize = [
+        {'ticker': candidate['ticker'], 'name': candidate['name']}
+        for candidate in candidates
+        if candidate['ticker'] not in summarized_tickers
+    ]
     
     if not stocks_to_summarize:
         logger.info("No new summaries needed (all cached)")
         return {'success_count': 0, 'failed_count': 0, 'errors': []}
     
+    # 남은 종목이 있을 때만 이번 run의 뉴스를 한 번에 로드
+    news_map = db.get_news_items_by_run(run_date)
+    
     # Gemini API 설정 - 2.5 Pro로 업그레이드 (더 정확한 요약)
     try:
-        genai.configure(api_key=api_key)
         model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-pro')
-        model = genai.GenerativeModel(model_name)
+        model = get_gemini_model(model_name)
         logger.info(f"Using Gemini model: {model_name}")
         
         # 배치 크기 설정 (Pro 모델은 더 느리므로 줄임)
         batch_size = int(os.getenv('LLM_BATCH_SIZE', '5'))
         
-        # 배치 단위로 처리
-        for i in range(0, len(stocks_to_summarize), batch_size):
-            batch = stocks_to_summarize[i:i + batch_size]
-            
-            logger.info(f"배치 요약 생성 중 ({i+1}-{i+len(batch)}/{len(stocks_to_summarize)})")
-            
-            try:
-                summaries = get_batch_summaries_gemini(batch, model, run_date, db)
-                
-                for ticker, summary_data in summaries.items():
-                    if summary_data['success']:
-                        success_count += 1
-                        db.update_candidate_status(run_date, ticker, 'summarized')
-                    else:
-                        failed_count += 1
-                        errors.append(f"Summary failed for {ticker}")
-                
-                # Rate limiting
-                time.sleep(2)
-            
-            except Exception as e:
-                logger.error(f"Batch summary failed: {e}")
+        # 배치 단위로 나누어 동시 처리 (종목 수 + 프롬프트 크기 기준)
+        batches = _pack_batches(stocks_to_summarize, news_map, batch_size, max_news=5)
+        logger.info(f"배치 요약 생성 중 ({len(stocks_to_summarize)}개 종목, {len(batches)}개 배치)")
+        
+        batch_results = run_llm_batches(
+            batches, lambda batch: get_batch_summaries_gemini(batch, model, run_date, db, news_map)
+        )
+        
+        # 모든 배치 완료 후 상태 업데이트는 executemany 한 번으로 처리
+        summarized = {}
+        for batch, summaries in zip(batches, batch_results):
+            if isinstance(summaries, Exception):
+                logger.error(f"Batch summary failed: {summaries}")
                 failed_count += len(batch)
-                errors.append(f"Batch summary error: {e}")
+                errors.append(f"Batch summary error: {summaries}")
+                continue
+            
+            for ticker, summary_data in summaries.items():
+                if summary_data['success']:
+                    success_count += 1
+                    summarized[ticker] = 'summarized'
+                else:
+                    failed_count += 1
+                    errors.append(f"Summary failed for {ticker}")
+        
+        db.update_candidate_statuses(run_date, summarized)
     
     except Exception as e:
         logger.error(f"Gemini API setup failed: {e}", exc_info=True)
@@ -229,8 +335,7 @@ def generate_study_notes(run_date: str, candidates: List[Dict],
     Returns:
         {'success_count': int, 'failed_count': int, 'errors': []}
     """
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
+    if not ensure_gemini():
         logger.warning("GEMINI_API_KEY not found. Skipping study notes.")
         return {'success_count': 0, 'failed_count': 0, 'errors': ['No API key']}
     
@@ -239,17 +344,19 @@ def generate_study_notes(run_date: str, candidates: List[Dict],
     errors = []
     
     # 학습 메모가 필요한 종목만 필터링
+    noted_tickers = db.existing_note_tickers(run_date)
+    news_map = db.get_news_items_by_run(run_date)
     stocks_to_note = []
     for candidate in candidates:
         ticker = candidate['ticker']
         
         # 이미 학습 메모가 있는지 확인
-        if db.has_study_note(run_date, ticker):
+        if ticker in noted_tickers:
             logger.debug(f"Study note already exists for {ticker}, skipping")
             continue
         
         # 뉴스가 있는 종목만 처리
-        news_items = db.get_news_items(run_date, ticker)
+        news_items = news_map.get(ticker)
         if not news_items:
             continue
         
@@ -265,36 +372,33 @@ def generate_study_notes(run_date: str, candidates: List[Dict],
     
     # Gemini API 설정
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        model = get_gemini_model('gemini-2.0-flash-exp')
         
         # 배치 크기 (학습 메모는 더 신중하게 3개씩)
         batch_size = 3
         
-        # 배치 단위로 처리
-        for i in range(0, len(stocks_to_note), batch_size):
-            batch = stocks_to_note[i:i + batch_size]
-            
-            logger.info(f"배치 학습 메모 생성 중 ({i+1}-{i+len(batch)}/{len(stocks_to_note)})")
-            
-            try:
-                notes = get_batch_study_notes_gemini(batch, model, run_date, db)
-                
-                for ticker, note_data in notes.items():
-                    if note_data['success']:
-                        success_count += 1
-                        logger.info(f"✓ {ticker}: 학습 메모 생성 완료 (신뢰도: {note_data.get('confidence', 'unknown')})")
-                    else:
-                        failed_count += 1
-                        errors.append(f"Study note failed for {ticker}")
-                
-                # Rate limiting (학습 메모는 더 보수적으로)
-                time.sleep(3)
-            
-            except Exception as e:
-                logger.error(f"Batch study note failed: {e}")
+        # 배치 단위로 나누어 동시 처리 (종목 수 + 프롬프트 크기 기준)
+        batches = _pack_batches(stocks_to_note, news_map, batch_size, max_news=10)
+        logger.info(f"배치 학습 메모 생성 중 ({len(stocks_to_note)}개 종목, {len(batches)}개 배치)")
+        
+        batch_results = run_llm_batches(
+            batches, lambda batch: get_batch_study_notes_gemini(batch, model, run_date, db, news_map)
+        )
+        
+        for batch, notes in zip(batches, batch_results):
+            if isinstance(notes, Exception):
+                logger.error(f"Batch study note failed: {notes}")
                 failed_count += len(batch)
-                errors.append(f"Batch study note error: {e}")
+                errors.append(f"Batch study note error: {notes}")
+                continue
+            
+            for ticker, note_data in notes.items():
+                if note_data['success']:
+                    success_count += 1
+                    logger.info(f"✓ {ticker}: 학습 메모 생성 완료 (신뢰도: {note_data.get('confidence', 'unknown')})")
+                else:
+                    failed_count += 1
+                    errors.append(f"Study note failed for {ticker}")
     
     except Exception as e:
         logger.error(f"Gemini API setup failed: {e}", exc_info=True)
@@ -308,13 +412,17 @@ def generate_study_notes(run_date: str, candidates: List[Dict],
 
 
 def get_batch_study_notes_gemini(stocks: List[Dict], model, run_date: str,
-                                 db: StudyDatabase) -> Dict:
+                                 db: StudyDatabase,
+                                 news_map: Optional[Dict[str, List[Dict]]] = None) -> Dict:
     """
     Gemini API로 백일공부 학습 메모 배치 생성
     
     백일공부 철학:
     1. 사실 수집 → 2. 사실 요약 → 3. 검증 → 4. 학습 메모 → 5. 신뢰도 평가
     
+    Args:
+        news_map: db.get_news_items_by_run() 결과 (없으면 종목별로 DB 조회)
+    
     Returns:
         {ticker: {'success': bool, 'confidence': str}, ...}
     """
@@ -325,117 +433,121 @@ def get_batch_study_notes_gemini(stocks: List[Dict], model, run_date: str,
         stock_news_map = {}
         for stock in stocks:
             ticker = stock['ticker']
-            news_items = db.get_news_items(run_date, ticker)
+            if news_map is not None:
+                news_items = news_map.get(ticker, [])
+            else:
+                news_items = db.get_news_items(run_date, ticker)
+            deduped = _dedup_news(news_items, max_n=10)  # 최대 10개만 사용
+            logger.debug(f"{ticker}: 뉴스 {len(news_items)}개 → {len(deduped)}개 (중복 제거/잘라내기)")
             
             # 뉴스 제목과 요약만 추출
             news_texts = []
-            for news in news_items[:10]:  # 최대 10개만 사용
-                news_texts.append(f"- [{news.get('publisher', '출처불명')}] {news['title']}: {news.get('snippet', '')}")
+            for news in deduped:
+                news_texts.append(f"- [{news.get('publisher', '출처불명')}] {news['title']}: {news['snippet']}")
             
             stock_news_map[ticker] = {
                 'name': stock['name'],
                 'news_texts': '\n'.join(news_texts) if news_texts else '(뉴스 없음)'
             }
         
-        # 프롬프트 구성 (백일공부 철학 반영)
-        stock_sections = []
-        for ticker, info in stock_news_map.items():
-            stock_sections.append(
-                f"### {info['name']} ({ticker})\n"
-                f"관련 뉴스:\n{info['news_texts']}\n"
-            )
+        # 캐시 확인 (같은 종목·같은 뉴스 내용이면 LLM 호출 생략)
+        hash_by_ticker = {
+            ticker: content_hash('study_note', ticker, info['news_texts'])
+            for ticker, info in stock_news_map.items()
+        }
+        cached = db.get_llm_cache(list(hash_by_ticker.values()))
+        cached_notes = {
+            ticker: loads_json(cached[key])
+            for ticker, key in hash_by_ticker.items()
+            if key in cached
+        }
+        if cached_notes:
+            # 캐시 적중분은 한 번에 저장
+            try:
+                db.insert_study_notes([
+                    _study_note_row(run_date, ticker, note_data)
+                    for ticker, note_data in cached_notes.items()
+                ])
+                for ticker, note_data in cached_notes.items():
+                    results[ticker] = {'success': True, 'confidence': note_data.get('ai_confidence', 'unknown')}
+            except Exception as e:
+                logger.error(f"Failed to save cached study notes: {e}")
+                for ticker in cached_notes:
+                    results[ticker] = {'success': False}
+            for ticker in cached_notes:
+                del stock_news_map[ticker]
         
-        stocks_text = "\n".join(stock_sections)
+        if not stock_news_map:
+            logger.info(f"학습 메모 {len(results)}개 캐시 사용 (LLM 호출 생략)")
+            return results
         
-        prompt = f"""당신은 "주식 공부용 학습 메모"를 작성하는 AI입니다. 
-아래 종목들에 대해 뉴스를 분석하고, 각 종목마다 다음 형식의 JSON을 생성하세요:
-
-**백일공부 원칙:**
-1. 사실만 추출 (추측/예측 금지)
-2. 여러 기사에서 공통으로 반복되는 내용만 요약
-3. 학습 메모는 "이 종목에서 배울 점"을 일반화된 문장으로 작성
-4. 신뢰도 평가: high(3개 이상 기사 일치), mid(2개 기사 일치), low(단일 기사 또는 불명확)
-
-**출력 형식 (JSON):**
-```json
-{{
-  "종목코드": {{
-    "factual_summary": "여러 기사에서 공통으로 언급된 사실만 2-3문장으로 요약. 단일 기사 주장은 제외.",
-    "ai_learning_note": "이 종목에서 배울 수 있는 일반화된 교훈. 특정 종목명 언급 금지. 다음에 비슷한 패턴을 만났을 때 체크할 조건 포함. 감정/예측/권유 금지.",
-    "ai_confidence": "high 또는 mid 또는 low",
-    "verification_status": "기사 간 내용 일치 여부 또는 '확인 필요' 메시지"
-  }}
-}}
-```
-
-**예시:**
-```json
-{{
-  "123456": {{
-    "factual_summary": "복수의 언론사가 A사와의 계약 체결을 보도. 계약 규모는 100억원으로 일치.",
-    "ai_learning_note": "주요 고객사와의 대규모 계약 체결 시 단기 급등 가능성. 계약 규모, 고객사 신뢰도, 기존 매출 대비 비중 확인 필요.",
-    "ai_confidence": "high",
-    "verification_status": "3개 언론사 보도 내용 일치"
-  }}
-}}
-```
-
-**분석할 종목:**
-{stocks_text}
-
-**중요:** JSON만 출력하세요. 다른 설명은 불필요합니다.
-"""
+        # 프롬프트 구성 (백일공부 철학 반영)
+        sections = [
+            f"### {info['name']} ({ticker})\n관련 뉴스:\n{info['news_texts']}\n\n"
+            for ticker, info in stock_news_map.items()
+        ]
+        prompt = _STUDY_NOTE_PREFIX + "".join(sections) + _STUDY_NOTE_SUFFIX
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        # 스트리밍 응답에서 종목별 JSON이 완성되는 즉시 DB에 저장
+        new_cache = {}
+        received = 0
+        for ticker, note_data in iter_json_members(stream_text(model, prompt)):
+            received += 1
+            results[ticker] = _save_study_note(db, run_date, ticker, note_data)
+            if results[ticker]['success'] and ticker in hash_by_ticker:
+                new_cache[hash_by_ticker[ticker]] = json.dumps(note_data, separators=(',', ':'), ensure_ascii=False)
         
-        # JSON 파싱
-        response_text = response_text.replace("```json", "").replace("```", "").strip()
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
+        db.put_llm_cache(new_cache, getattr(model, 'model_name', None))
         
-        if start_idx != -1 and end_idx != -1:
-            json_text = response_text[start_idx:end_idx+1]
-            json_response = json.loads(json_text)
-            
-            # DB에 저장
-            for ticker, note_data in json_response.items():
-                try:
-                    db.insert_study_note({
-                        'run_date': run_date,
-                        'ticker': ticker,
-                        'factual_summary': note_data.get('factual_summary'),
-                        'ai_learning_note': note_data.get('ai_learning_note'),
-                        'ai_confidence': note_data.get('ai_confidence', 'low'),
-                        'verification_status': note_data.get('verification_status')
-                    })
-                    
-                    results[ticker] = {
-                        'success': True, 
-                        'confidence': note_data.get('ai_confidence', 'unknown')
-                    }
-                
-                except Exception as e:
-                    logger.error(f"Failed to save study note for {ticker}: {e}")
-                    results[ticker] = {'success': False}
-        else:
+        if not received:
             logger.warning("Gemini 응답에서 JSON을 찾을 수 없습니다")
             for stock in stocks:
-                results[stock['ticker']] = {'success': False}
+                results.setdefault(stock['ticker'], {'success': False})
     
     except Exception as e:
         logger.error(f"Batch study note generation failed: {e}", exc_info=True)
         for stock in stocks:
-            results[stock['ticker']] = {'success': False}
+            results.setdefault(stock['ticker'], {'success': False})
     
     return results
 
 
+def _study_note_row(run_date: str, ticker: str, note_data: Dict) -> Dict:
+    """study_notes 테이블 저장용 딕셔너리"""
+    return {
+        'run_date': run_date,
+        'ticker': ticker,
+        'factual_summary': note_data.get('factual_summary'),
+        'ai_learning_note': note_data.get('ai_learning_note'),
+        'ai_confidence': note_data.get('ai_confidence', 'low'),
+        'verification_status': note_data.get('verification_status')
+    }
+
+
+def _save_study_note(db: StudyDatabase, run_date: str, ticker: str, note_data: Dict) -> Dict:
+    """학습 메모 한 건을 DB에 저장하고 결과 딕셔너리 반환"""
+    try:
+        db.insert_study_note(_study_note_row(run_date, ticker, note_data))
+        
+        return {
+            'success': True, 
+            'confidence': note_data.get('ai_confidence', 'unknown')
+        }
+    
+    except Exception as e:
+        logger.error(f"Failed to save study note for {ticker}: {e}")
+        return {'success': False}
+
+
 def get_batch_summaries_gemini(stocks: List[Dict], model, run_date: str, 
-                               db: StudyDatabase) -> Dict:
+                               db: StudyDatabase,
+                               news_map: Optional[Dict[str, List[Dict]]] = None) -> Dict:
     """
     Gemini API로 배치 요약 생성 (뉴스 기반 - 환각 방지)
     
+    Args:
+        news_map: db.get_news_items_by_run() 결과 (없으면 종목별로 DB 조회)
+    
     Returns:
         {ticker: {'success': bool, 'summary': str}, ...}
     """
@@ -446,86 +558,105 @@ def get_batch_summaries_gemini(stocks: List[Dict], model, run_date: str,
         stock_news_map = {}
         for stock in stocks:
             ticker = stock['ticker']
-            news_items = db.get_news_items(run_date, ticker)
+            if news_map is not None:
+                news_items = news_map.get(ticker, [])
+            else:
+                news_items = db.get_news_items(run_date, ticker)
+            deduped = _dedup_news(news_items, max_n=5)
+            logger.debug(f"{ticker}: 뉴스 {len(news_items)}개 → {len(deduped)}개 (중복 제거/잘라내기)")
             
             # 뉴스 제목과 요약만 추출 (최대 5개)
             news_texts = []
-            for news in news_items[:5]:
+            for news in deduped:
                 news_texts.append(f"- [{news.get('publisher', '')}] {news['title']}")
-                if news.get('snippet'):
-                    news_texts.append(f"  {news.get('snippet')}")
+                if news['snippet']:
+                    news_texts.append(f"  {news['snippet']}")
             
             stock_news_map[ticker] = {
                 'name': stock['name'],
                 'news_texts': '\n'.join(news_texts) if news_texts else '(뉴스 없음)'
             }
         
-        # 프롬프트 구성 (뉴스 기반)
-        stock_sections = []
-        for ticker, info in stock_news_map.items():
-            stock_sections.append(
-                f"### {info['name']} ({ticker})\n"
-                f"관련 뉴스:\n{info['news_texts']}\n"
-            )
+        # 캐시 확인 (같은 종목·같은 뉴스 내용이면 LLM 호출 생략)
+        hash_by_ticker = {
+            ticker: content_hash('summary', ticker, info['news_texts'])
+            for ticker, info in stock_news_map.items()
+        }
+        cached = db.get_llm_cache(list(hash_by_ticker.values()))
+        cached_summaries = {
+            ticker: cached[key]
+            for ticker, key in hash_by_ticker.items()
+            if key in cached
+        }
+        if cached_summaries:
+            # 캐시 적중분은 한 번에 저장
+            try:
+                db.insert_summaries([
+                    _summary_row(run_date, ticker, summary_text)
+                    for ticker, summary_text in cached_summaries.items()
+                ])
+                for ticker, summary_text in cached_summaries.items():
+                    results[ticker] = {'success': True, 'summary': summary_text}
+            except Exception as e:
+                logger.error(f"Failed to save cached summaries: {e}")
+                for ticker in cached_summaries:
+                    results[ticker] = {'success': False}
+            for ticker in cached_summaries:
+                del stock_news_map[ticker]
         
-        stocks_text = "\n".join(stock_sections)
+        if not stock_news_map:
+            logger.info(f"요약 {len(results)}개 캐시 사용 (LLM 호출 생략)")
+            return results
         
-        prompt = f"""아래 종목들을 **수집된 뉴스 내용만을 근거로** 요약하세요.
-
-**중요:**
-- 뉴스가 없으면 "관련 뉴스 없음"이라고만 적으세요
-- 추측하지 말고 뉴스에 명시된 사실만 요약
-- 각 종목당 2-4문장
-
-**출력 형식 (JSON):**
-```json
-{{
-  "종목코드": "뉴스 기반 요약 내용"
-}}
-```
-
-**종목 및 뉴스:**
-{stocks_text}
-
-**JSON만 출력:**
-"""
+        # 프롬프트 구성 (뉴스 기반)
+        sections = [
+            f"### {info['name']} ({ticker})\n관련 뉴스:\n{info['news_texts']}\n\n"
+            for ticker, info in stock_news_map.items()
+        ]
+        prompt = _SUMMARY_PREFIX + "".join(sections) + _SUMMARY_SUFFIX
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        # 스트리밍 응답에서 종목별 요약이 완성되는 즉시 DB에 저장
+        new_cache = {}
+        received = 0
+        for ticker, summary_text in iter_json_members(stream_text(model, prompt)):
+            received += 1
+            results[ticker] = _save_summary(db, run_date, ticker, summary_text)
+            if results[ticker]['success'] and ticker in hash_by_ticker:
+                new_cache[hash_by_ticker[ticker]] = summary_text
         
-        # JSON 파싱
-        response_text = response_text.replace("```json", "").replace("```", "").strip()
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}')
+        db.put_llm_cache(new_cache, getattr(model, 'model_name', None))
         
-        if start_idx != -1 and end_idx != -1:
-            json_text = response_text[start_idx:end_idx+1]
-            json_response = json.loads(json_text)
-            
-            # DB에 저장
-            for ticker, summary_text in json_response.items():
-                try:
-                    db.insert_summary({
-                        'run_date': run_date,
-                        'ticker': ticker,
-                        'summary_text': summary_text,
-                        'llm_provider': 'gemini',
-                        'llm_model': 'gemini-2.0-flash-exp'
-                    })
-                    
-                    results[ticker] = {'success': True, 'summary': summary_text}
-                
-                except Exception as e:
-                    logger.error(f"Failed to save summary for {ticker}: {e}")
-                    results[ticker] = {'success': False}
-        else:
+        if not received:
             logger.warning("Gemini 응답에서 JSON을 찾을 수 없습니다")
             for stock in stocks:
-                results[stock['ticker']] = {'success': False}
+                results.setdefault(stock['ticker'], {'success': False})
     
     except Exception as e:
         logger.error(f"Batch summary generation failed: {e}", exc_info=True)
         for stock in stocks:
-            results[stock['ticker']] = {'success': False}
+            results.setdefault(stock['ticker'], {'success': False})
     
     return results
+
+
+def _summary_row(run_date: str, ticker: str, summary_text: str) -> Dict:
+    """summaries 테이블 저장용 딕셔너리"""
+    return {
+        'run_date': run_date,
+        'ticker': ticker,
+        'summary_text': summary_text,
+        'llm_provider': 'gemini',
+        'llm_model': 'gemini-2.0-flash-exp'
+    }
+
+
+def _save_summary(db: StudyDatabase, run_date: str, ticker: str, summary_text: str) -> Dict:
+    """요약 한 건을 DB에 저장하고 결과 딕셔너리 반환"""
+    try:
+        db.insert_summary(_summary_row(run_date, ticker, summary_text))
+        
+        return {'success': True, 'summary': summary_text}
+    
+    except Exception as e:
+        logger.error(f"Failed to save summary for {ticker}: {e}")
+        return {'success': False}
@@ -1,26 +1,52 @@
 """
 시장 데이터 및 뉴스 수집 모듈
 """
-import time
+import os
 import json
+import asyncio
 import requests
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Dict, Optional
 
+import numpy as np
+import pandas as pd
 from pykrx import stock
 
 from hantubot.reporting.logger import get_logger
 from hantubot.utils.stock_filters import is_eligible_stock
+from hantubot.utils.async_runner import run_coroutine
 from hantubot.providers import NaverNewsProvider
 from hantubot.study.repository import StudyDatabase
 
 logger = get_logger(__name__)
 
 
-def collect_market_data(run_date: str, db: StudyDatabase) -> List[Dict]:
+@lru_cache(maxsize=4096)
+def get_ticker_name(ticker: str) -> str:
+    """종목명 조회 (pykrx 호출 결과를 프로세스 단위로 캐싱)"""
+    return stock.get_market_ticker_name(ticker)
+
+
+@lru_cache(maxsize=8)
+def get_derivative_tickers(run_date: str) -> frozenset:
+    """ETF/ETN/ELW 종목코드 집합 (종목명 조회 없이 코드만으로 제외하기 위함)"""
+    tickers = set()
+    for fetch in (stock.get_etf_ticker_list, stock.get_etn_ticker_list, stock.get_elw_ticker_list):
+        try:
+            tickers.update(fetch(run_date))
+        except Exception as e:
+            logger.warning(f"{fetch.__name__} 조회 실패 (종목명 필터로 대체): {e}")
+    return frozenset(tickers)
+
+
+def collect_market_data(run_date: str, db: StudyDatabase,
+                        df_all: Optional[pd.DataFrame] = None) -> List[Dict]:
     """
     시장 데이터 수집 및 후보 종목 필터링
     
+    Args:
+        df_all: 이미 받아 둔 run_date의 전 종목 OHLCV (없으면 pykrx로 조회)
+    
     Returns:
         후보 종목 리스트
     """
@@ -28,11 +54,12 @@ def collect_market_data(run_date: str, db: StudyDatabase) -> List[Dict]:
     
     try:
         # pykrx로 전체 종목 조회
-        try:
-            df_all = stock.get_market_ohlcv_by_ticker(run_date, market="ALL")
-        except (requests.exceptions.JSONDecodeError, json.JSONDecodeError):
-            logger.warning("KRX 서버로부터 유효한 데이터를 받지 못했습니다. (JSON Decode Error) - 공부 단계를 건너뜁니다.")
-            return candidates
+        if df_all is None:
+            try:
+                df_all = stock.get_market_ohlcv_by_ticker(run_date, market="ALL")
+            except (requests.exceptions.JSONDecodeError, json.JSONDecodeError):
+                logger.warning("KRX 서버로부터 유효한 데이터를 받지 못했습니다. (JSON Decode Error) - 공부 단계를 건너뜁니다.")
+                return candidates
 
         if df_all.empty:
             logger.warning("No market data available for today")
@@ -47,11 +74,16 @@ def collect_market_data(run_date: str, db: StudyDatabase) -> List[Dict]:
             logger.info("No stocks met the criteria")
             return candidates
         
-        # ETF, 스팩 등 제외
-        unfiltered_tickers = interesting_df.index.tolist()
+        # ETF, 스팩 등 제외 (ETF/ETN/ELW는 코드로 먼저 걸러서 종목명 조회 횟수 절감)
+        excluded_tickers = get_derivative_tickers(run_date)
+        unfiltered_tickers = [
+            ticker for ticker in interesting_df.index.tolist()
+            if ticker not in excluded_tickers
+        ]
+        names = {ticker: get_ticker_name(ticker) for ticker in unfiltered_tickers}
         eligible_tickers = [
             ticker for ticker in unfiltered_tickers
-            if is_eligible_stock(stock.get_market_ticker_name(ticker))
+            if is_eligible_stock(names[ticker])
         ]
         
         if not eligible_tickers:
@@ -64,46 +96,44 @@ def collect_market_data(run_date: str, db: StudyDatabase) -> List[Dict]:
         except:
             df_trading_value = None
         
-        # 후보 종목 정보 구성
-        for ticker in eligible_tickers:
-            try:
-                stock_info = interesting_df.loc[ticker]
-                stock_name = stock.get_market_ticker_name(ticker)
-                
-                # 시장 구분 (KOSPI/KOSDAQ)
-                market = stock.get_market_ticker_list(run_date, market="KOSPI")
-                market_type = "KOSPI" if ticker in market else "KOSDAQ"
-                
-                # 선정 사유
-                reasons = []
-                if stock_info['등락률'] >= 29.0:
-                    reasons.append('limit_up')
-                if stock_info['거래량'] >= 10_000_000:
-                    reasons.append('volume_10m')
-                reason_flag = ' / '.join(reasons) if reasons else 'both'
-                
-                # 거래대금
-                value_traded = None
-                if df_trading_value is not None and ticker in df_trading_value.index:
-                    value_traded = int(df_trading_value.loc[ticker, '거래대금'])
-                
-                candidate = {
-                    'run_date': run_date,
-                    'ticker': ticker,
-                    'name': stock_name,
-                    'market': market_type,
-                    'close_price': int(stock_info['종가']),
-                    'change_pct': float(stock_info['등락률']),
-                    'volume': int(stock_info['거래량']),
-                    'value_traded': value_traded,
-                    'reason_flag': reason_flag
-                }
-                
-                candidates.append(candidate)
-            
-            except Exception as e:
-                logger.error(f"Failed to process ticker {ticker}: {e}")
-                continue
+        # 시장 구분용 KOSPI 종목 목록 (루프 밖에서 한 번만 조회)
+        try:
+            kospi_tickers = set(stock.get_market_ticker_list(run_date, market="KOSPI"))
+        except Exception as e:
+            logger.warning(f"KOSPI 종목 목록 조회 실패 (전부 KOSDAQ으로 표기): {e}")
+            kospi_tickers = set()
+        
+        # 후보 종목 정보 구성 (종목별 .loc 접근 대신 컬럼 단위로 한 번에 계산)
+        df = interesting_df.loc[eligible_tickers, ['종가', '등락률', '거래량']]
+        
+        # 선정 사유 (필터 단계에서 계산한 마스크를 그대로 재사용)
+        limit_up = price_ceil_filter.reindex(df.index)
+        volume_10m = volume_filter.reindex(df.index)
+        reason_flag = np.select(
+            [limit_up & volume_10m, limit_up, volume_10m],
+            ['limit_up / volume_10m', 'limit_up', 'volume_10m'],
+            default='both'
+        )
+        
+        # 거래대금 (조회 실패 또는 누락 종목은 None)
+        if df_trading_value is not None:
+            value_traded = df_trading_value['거래대금'].reindex(df.index).astype('Int64').astype(object)
+            value_traded = value_traded.where(value_traded.notna(), None)
+        else:
+            value_traded = pd.Series(None, index=df.index, dtype=object)
+        
+        candidate_df = pd.DataFrame({
+            'run_date': run_date,
+            'ticker': df.index,
+            'name': df.index.map(names),
+            'market': np.where(df.index.isin(kospi_tickers), 'KOSPI', 'KOSDAQ'),
+            'close_price': df['종가'].astype('int64').to_numpy(),
+            'change_pct': df['등락률'].astype(float).to_numpy(),
+            'volume': df['거래량'].astype('int64').to_numpy(),
+            'value_traded': value_traded.to_numpy(),
+            'reason_flag': reason_flag
+        })
+        candidates = candidate_df.to_dict('records')
         
         # DB에 일괄 저장
         if candidates:
@@ -120,20 +150,21 @@ def collect_market_data(run_date: str, db: StudyDatabase) -> List[Dict]:
 def collect_news_for_candidates(run_date: str, candidates: List[Dict], 
                                  db: StudyDatabase) -> Dict:
     """
-    후보 종목들의 뉴스 수집 (병렬 처리로 3배 빠름)
+    후보 종목들의 뉴스 수집 (asyncio 병렬 처리, 동시 요청 수는 NEWS_CONCURRENCY로 제한)
     
     Returns:
         {'total_news': int, 'failed_tickers': int, 'errors': []}
     """
     
     news_provider = NaverNewsProvider(max_items_per_ticker=20)
+    concurrency = max(1, int(os.getenv('NEWS_CONCURRENCY', '8')))
     
     total_news = 0
     failed_tickers = 0
     errors = []
     
     def fetch_single_news(candidate):
-        """단일 종목 뉴스 수집 (스레드 내에서 실행)"""
+        """단일 종목 뉴스 수집 (워커 스레드 내에서 실행)"""
         ticker = candidate['ticker']
         stock_name = candidate['name']
         
@@ -171,39 +202,46 @@ def collect_news_for_candidates(run_date: str, candidates: List[Dict],
                 'error': str(e)
             }
     
-    # 병렬 처리 (최대 5개 스레드 동시 실행)
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        # 모든 종목에 대해 비동기 작업 제출
-        future_to_candidate = {
-            executor.submit(fetch_single_news, candidate): candidate 
-            for candidate in candidates
-        }
-        
-        # 완료된 작업부터 순서대로 처리
-        for future in as_completed(future_to_candidate):
-            result = future.result()
+    async def fetch_all():
+        """세마포어로 동시 요청 수를 제한하며 전체 종목 뉴스 수집"""
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def fetch_one(candidate):
+            async with sem:
+                return await asyncio.to_thread(fetch_single_news, candidate)
+        
+        return await asyncio.gather(
+            *(fetch_one(candidate) for candidate in candidates),
+            return_exceptions=True
+        )
+    
+    results = run_coroutine(fetch_all())
+    
+    # DB 저장은 수집 완료 후 메인 스레드에서 단일 트랜잭션으로 일괄 처리 (SQLite 경합/fsync 최소화)
+    all_news_items = []
+    statuses = {}
+    for candidate, result in zip(candidates, results):
+        if isinstance(result, BaseException):
+            result = {'success': False, 'ticker': candidate['ticker'], 'error': str(result)}
+        
+        ticker = result['ticker']
+        if result['success']:
+            news_items = result.get('news_items', [])
             
-            if result['success']:
-                ticker = result['ticker']
-                news_items = result.get('news_items', [])
-                
-                if news_items:
-                    # DB 저장 (메인 스레드에서 안전하게)
-                    db.insert_news_items(news_items)
-                    total_news += result['count']
-                    db.update_candidate_status(run_date, ticker, 'news_collected')
-                    logger.debug(f"✓ {ticker}: {result['count']}개 뉴스 수집")
-                else:
-                    logger.warning(f"✗ {ticker}: 뉴스 없음")
-                    db.update_candidate_status(run_date, ticker, 'no_news')
+            if news_items:
+                all_news_items.extend(news_items)
+                total_news += result['count']
+                statuses[ticker] = 'news_collected'
+                logger.debug(f"✓ {ticker}: {result['count']}개 뉴스 수집")
             else:
-                ticker = result['ticker']
-                db.update_candidate_status(run_date, ticker, 'news_failed')
-                failed_tickers += 1
-                errors.append(f"News collection failed for {ticker}: {result.get('error', 'Unknown')}")
-            
-            # Rate limiting (전체적으로)
-            time.sleep(0.1)
+                logger.warning(f"✗ {ticker}: 뉴스 없음")
+                statuses[ticker] = 'no_news'
+        else:
+            statuses[ticker] = 'news_failed'
+            failed_tickers += 1
+            errors.append(f"News collection failed for {ticker}: {result.get('error', 'Unknown')}")
+    
+    db.save_news_results(run_date, all_news_items, statuses)
     
     return {
         'total_news': total_news,
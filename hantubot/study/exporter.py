@@ -75,22 +75,19 @@ def backup_to_gsheet(run_date: str, db: StudyDatabase, notifier):
     """Google Sheets 백업 (옵션)"""
     try:
         from hantubot.reporting.study_legacy import get_gsheet_client, get_worksheet_or_create
-        from gspread_dataframe import set_with_dataframe
-        import pandas as pd
         
-        # 데이터 조회
-        data = db.get_full_study_data(run_date)
-        candidates = data['candidates']
-        summaries = data['summaries']
+        # 데이터 조회 (뉴스/학습 메모는 시트에 쓰지 않으므로 후보와 요약 본문만)
+        candidates = db.get_candidates(run_date)
         
         if not candidates:
             return
         
+        summaries = db.get_summary_texts(run_date)
+        
         # DataFrame 구성
         records = []
         for candidate in candidates:
             ticker = candidate['ticker']
-            summary = summaries.get(ticker, {})
             
             records.append({
                 '날짜': run_date,
@@ -100,7 +97,7 @@ def backup_to_gsheet(run_date: str, db: StudyDatabase, notifier):
                 '종가': f"{candidate['close_price']:,}",
                 '등락률': f"{candidate['change_pct']:.2f}%",
                 '거래량': f"{candidate['volume']:,}",
-                '기업개요': summary.get('summary_text', '요약 없음')
+                '기업개요': summaries.get(ticker, '요약 없음')
             })
         
         # Google Sheets 업데이트
@@ -108,16 +105,15 @@ def backup_to_gsheet(run_date: str, db: StudyDatabase, notifier):
         spreadsheet = gsheet_client.open("시장 관심주 추적")
         log_ws = get_worksheet_or_create(spreadsheet, "DailyLog")
         
-        # 기존 데이터와 병합
-        existing_df = pd.DataFrame(log_ws.get_all_records())
-        new_df = pd.DataFrame(records).astype(str)
-        
-        if not existing_df.empty:
-            combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-        else:
-            combined_df = new_df
+        # 기존 데이터를 내려받지 않고 새 행만 추가 (헤더 한 줄만 확인)
+        header = log_ws.row_values(1)
+        rows = []
+        if not header:
+            header = list(records[0].keys())
+            rows.append(header)
+        rows.extend([str(record.get(col, '')) for col in header] for record in records)
         
-        set_with_dataframe(log_ws, combined_df, include_index=False, resize=True)
+        log_ws.append_rows(rows, value_input_option='USER_ENTERED', insert_data_option='INSERT_ROWS')
         logger.info(f"Backed up {len(records)} records to Google Sheets")
     
     except Exception as e:
@@ -228,7 +224,7 @@ def send_completion_notification(run_date: str, stats: Dict, notifier, db: Study
     """완료 알림 발송"""
     try:
         # 상위 5개 종목 정보
-        candidates = db.get_candidates(run_date)[:5]
+        candidates = db.get_top_candidates(run_date, 5)
         
         fields = []
         for candidate in candidates:
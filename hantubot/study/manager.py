@@ -3,6 +3,9 @@
 """
 import os
 from datetime import datetime
+from typing import Optional, Tuple
+
+import pandas as pd
 from pykrx import stock
 
 from hantubot.reporting.logger import get_logger
@@ -19,33 +22,53 @@ from hantubot.study.exporter import (
 logger = get_logger(__name__)
 
 
-def get_latest_trading_date() -> str:
+def get_latest_trading_snapshot() -> Tuple[str, Optional[pd.DataFrame]]:
     """
-    최근 거래일을 조회합니다 (오늘이 휴장일이면 이전 거래일 반환)
+    최근 거래일과 해당일 전 종목 OHLCV를 함께 반환합니다
     
     Returns:
-        YYYYMMDD 형식의 최근 거래일
+        (YYYYMMDD 형식의 최근 거래일, 전 종목 OHLCV DataFrame 또는 None)
     """
     from datetime import timedelta
     
     today = datetime.now()
+    check_date = today
     
-    # 최대 10일 전까지 확인 (주말, 공휴일 고려)
-    for i in range(10):
-        check_date = today - timedelta(days=i)
+    # 최대 10번 확인 (주말, 공휴일, 당일 데이터 미게시 고려)
+    for _ in range(10):
         date_str = check_date.strftime("%Y%m%d")
         
+        # pykrx 영업일 조회로 주말/휴장일을 건너뜀 (실패 시 달력 날짜 그대로 확인)
+        try:
+            date_str = stock.get_nearest_business_day_in_a_week(date=date_str, prev=True) or date_str
+        except Exception as e:
+            logger.warning(f"영업일 조회 실패, 일별 데이터 확인으로 대체: {e}")
+        
         try:
-            # pykrx로 해당 날짜에 시장 데이터가 있는지 확인
-            df = stock.get_market_ohlcv_by_ticker(date_str, market="KOSPI")
+            # 영업일이라도 KRX가 아직 데이터를 게시하지 않았을 수 있으므로 실제 데이터로 확인
+            # 전체 시장으로 조회해서 collect_market_data가 같은 데이터를 다시 받지 않도록 함
+            df = stock.get_market_ohlcv_by_ticker(date_str, market="ALL")
             if not df.empty:
                 logger.info(f"최근 거래일 확인: {date_str}")
-                return date_str
-        except:
-            continue
+                return date_str, df
+        except Exception:
+            pass
+        
+        # 데이터가 없으면 직전 영업일부터 다시 확인
+        check_date = datetime.strptime(date_str, "%Y%m%d") - timedelta(days=1)
     
     # 찾지 못하면 오늘 날짜 반환 (fallback)
-    return today.strftime("%Y%m%d")
+    return today.strftime("%Y%m%d"), None
+
+
+def get_latest_trading_date() -> str:
+    """
+    최근 거래일을 조회합니다 (오늘이 휴장일이면 이전 거래일 반환)
+    
+    Returns:
+        YYYYMMDD 형식의 최근 거래일
+    """
+    return get_latest_trading_snapshot()[0]
 
 
 def run_daily_study(broker, notifier, force_run=False, target_date=None):
@@ -66,10 +89,11 @@ def run_daily_study(broker, notifier, force_run=False, target_date=None):
     study_mode = os.getenv('STUDY_MODE', 'sqlite')  # sqlite / gsheet / both
     
     # 날짜 설정 (최근 거래일 자동 조회)
+    df_snapshot = None
     if target_date:
         today_str = target_date
     else:
-        today_str = get_latest_trading_date()
+        today_str, df_snapshot = get_latest_trading_snapshot()
         logger.info(f"자동 조회된 최근 거래일: {today_str}")
     
     # DB 초기화
@@ -106,7 +130,7 @@ def run_daily_study(broker, notifier, force_run=False, target_date=None):
     try:
         # ========== 단계 1: 시장 데이터 수집 ==========
         logger.info("[1/4] 시장 데이터 수집 중...")
-        candidates = collect_market_data(today_str, db)
+        candidates = collect_market_data(today_str, db, df_all=df_snapshot)
         stats['candidates'] = len(candidates)
         
         if not candidates:
@@ -163,6 +187,12 @@ def run_daily_study(broker, notifier, force_run=False, target_date=None):
         send_completion_notification(today_str, stats, notifier, db)
         
         # ========== DB 자동 백업 (옵션) ==========
+        # 파일 단위 백업/커밋 전에 WAL 내용을 study.db에 반영
+        try:
+            db.checkpoint()
+        except Exception as e:
+            logger.warning(f"WAL 체크포인트 실패 (무시됨): {e}")
+        
         try:
             logger.info("[추가] DB 자동 백업 체크 중...")
             backup_database()
@@ -3,7 +3,7 @@
 """
 import sqlite3
 import json
-from datetime import datetime
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from contextlib import contextmanager
@@ -13,9 +13,245 @@ from hantubot.reporting.logger import get_logger
 logger = get_logger(__name__)
 
 
+def _json_row(columns: str) -> str:
+    """'a, b, c' -> json_object('a', a, 'b', b, 'c', c) (SQLite JSON1로 행을 JSON 객체로 변환)"""
+    return 'json_object(' + ', '.join(f"'{col}', {col}" for col in columns.split(', ')) + ')'
+
+
+# 스키마 버전 (PRAGMA user_version, 기존 DB 마이그레이션 판단용)
+SCHEMA_VERSION = 2
+
+# 복합/단일 PK로만 조회하는 테이블은 WITHOUT ROWID (rowid B-tree 없이 PK B-tree에 행 저장)
+# DDL의 {name} 자리에는 테이블명이 들어감 (마이그레이션 시에는 임시 테이블명)
+# WITHOUT ROWID는 PK 컬럼에 NOT NULL을 강제하므로 마이그레이션 시 PK가 NULL인 행은 별도 백업 테이블로 옮김
+_WITHOUT_ROWID_KEYS = {
+    'daily_candidates': ('run_date', 'ticker'),
+    'summaries': ('run_date', 'ticker'),
+    'ticker_notes': ('ticker',),
+}
+_WITHOUT_ROWID_DDL = {
+    'daily_candidates': """
+        CREATE TABLE IF NOT EXISTS {name} (
+            run_date TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            name TEXT NOT NULL,
+            market TEXT,
+            close_price INTEGER,
+            change_pct REAL,
+            volume INTEGER,
+            value_traded INTEGER,
+            reason_flag TEXT,
+            data_collection_status TEXT DEFAULT 'pending',
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_date, ticker)
+        ) WITHOUT ROWID
+    """,
+    'summaries': """
+        CREATE TABLE IF NOT EXISTS {name} (
+            run_date TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            summary_text TEXT NOT NULL,
+            key_points_json TEXT,
+            keywords_json TEXT,
+            llm_provider TEXT DEFAULT 'gemini',
+            llm_model TEXT,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_date, ticker)
+        ) WITHOUT ROWID
+    """,
+    'ticker_notes': """
+        CREATE TABLE IF NOT EXISTS {name} (
+            ticker TEXT PRIMARY KEY,
+            note_text TEXT,
+            updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """,
+}
+
+# 전체 스키마 DDL (executescript로 한 번에 파싱/실행, user_version이 최신이면 생략)
+# 스키마를 바꿀 때는 SCHEMA_VERSION을 올려야 기존 DB에 반영됨
+_SCHEMA_SQL = f"""
+    -- 1. study_runs 테이블
+    CREATE TABLE IF NOT EXISTS study_runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_date TEXT NOT NULL UNIQUE,
+        started_at TEXT NOT NULL,
+        ended_at TEXT,
+        status TEXT NOT NULL,
+        error_message TEXT,
+        stats_json TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    -- 2. daily_candidates 테이블
+    {_WITHOUT_ROWID_DDL['daily_candidates'].format(name='daily_candidates')};
+    
+    -- 3. news_items 테이블
+    CREATE TABLE IF NOT EXISTS news_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_date TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        title TEXT NOT NULL,
+        publisher TEXT,
+        published_at TEXT,
+        url TEXT NOT NULL,
+        snippet TEXT,
+        raw_text TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(run_date, ticker, url)
+    );
+    
+    -- 4. summaries 테이블
+    {_WITHOUT_ROWID_DDL['summaries'].format(name='summaries')};
+    
+    -- 5. study_notes 테이블 (백일공부 학습 메모)
+    CREATE TABLE IF NOT EXISTS study_notes (
+        run_date TEXT NOT NULL,
+        ticker TEXT NOT NULL,
+        factual_summary TEXT,
+        ai_learning_note TEXT,
+        ai_confidence TEXT CHECK(ai_confidence IN ('high', 'mid', 'low')),
+        verification_status TEXT,
+        human_note TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_date, ticker)
+    );
+    
+    -- 6. ticker_notes 테이블 (범용 메모)
+    {_WITHOUT_ROWID_DDL['ticker_notes'].format(name='ticker_notes')};
+    
+    -- 7. closing_candidates 테이블 (종가매매 후보군)
+    CREATE TABLE IF NOT EXISTS closing_candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trade_date TEXT NOT NULL,
+        generated_at TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        ticker TEXT NOT NULL,
+        name TEXT NOT NULL,
+        score REAL,
+        reason TEXT,
+        selection_type TEXT,
+        market_trend TEXT,
+        price_at_signal INTEGER,
+        trading_value INTEGER,
+        sector TEXT,
+        raw_payload_json TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(trade_date, ticker)
+    );
+    
+    -- 8. closing_candidate_results 테이블 (종가매매 성과 평가)
+    CREATE TABLE IF NOT EXISTS closing_candidate_results (
+        candidate_id INTEGER PRIMARY KEY,
+        ticker TEXT NOT NULL,
+        eval_date TEXT NOT NULL,
+        next_open_return_pct REAL,
+        next_close_return_pct REAL,
+        next_day_mfe_pct REAL,
+        next_day_mae_pct REAL,
+        volume_ratio REAL,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(candidate_id) REFERENCES closing_candidates(id)
+    );
+    
+    -- 9. llm_cache 테이블 (뉴스 내용 해시 기반 LLM 응답 캐시)
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        content_hash TEXT PRIMARY KEY,
+        response_text TEXT NOT NULL,
+        llm_model TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    
+    -- 인덱스 생성
+    -- (run_date, ticker) 단건 조회는 daily_candidates/summaries/study_notes의 PK와
+    -- news_items의 UNIQUE(run_date, ticker, url) 자동 인덱스가 이미 처리함
+    -- 빈도 분석(get_ticker_frequency)을 테이블 접근 없이 인덱스만으로 처리하는 커버링 인덱스
+    -- (run_date 단독 인덱스는 PK와 이 인덱스가 대신하므로 제거)
+    DROP INDEX IF EXISTS idx_candidates_date;
+    CREATE INDEX IF NOT EXISTS idx_candidates_date_ticker_name
+    ON daily_candidates(run_date, ticker, name);
+    CREATE INDEX IF NOT EXISTS idx_news_ticker
+    ON news_items(ticker, run_date);
+    CREATE INDEX IF NOT EXISTS idx_summaries_date
+    ON summaries(run_date);
+    CREATE INDEX IF NOT EXISTS idx_study_notes_date
+    ON study_notes(run_date);
+    
+    -- run 삭제 시 자식 테이블 정리는 delete_run에서 직접 수행 (이전 버전의 삭제 트리거 제거)
+    DROP TRIGGER IF EXISTS trg_study_runs_delete;
+"""
+
+# 타임스탬프는 SQLite가 직접 생성 (기존 datetime.now().isoformat()과 같은 로컬 시각 ISO 형식)
+_SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# 자주 실행되는 쓰기 SQL (여러 메서드에서 같은 문자열을 써서 연결별 statement cache 적중)
+_SQL_INSERT_CANDIDATE = """
+    INSERT OR REPLACE INTO daily_candidates
+    (run_date, ticker, name, market, close_price, change_pct,
+     volume, value_traded, reason_flag, data_collection_status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+"""
+_SQL_UPDATE_STATUS = """
+    UPDATE daily_candidates
+    SET data_collection_status = ?
+    WHERE run_date = ? AND ticker = ?
+"""
+_SQL_INSERT_NEWS = """
+    INSERT OR IGNORE INTO news_items
+    (run_date, ticker, provider, title, publisher,
+     published_at, url, snippet, raw_text)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_SUMMARY = """
+    INSERT OR REPLACE INTO summaries
+    (run_date, ticker, summary_text, key_points_json,
+     keywords_json, llm_provider, llm_model)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_STUDY_NOTE = f"""
+    INSERT OR REPLACE INTO study_notes
+    (run_date, ticker, factual_summary, ai_learning_note,
+     ai_confidence, verification_status, human_note, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, {_SQL_NOW})
+"""
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """실행된 커서의 결과를 dict 리스트로 반환 (행마다 sqlite3.Row를 만들지 않고 튜플+컬럼명으로 변환)"""
+    cursor.row_factory = None
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+# get_full_study_data의 JSON1 집계 쿼리 (REAL 컬럼이 없는 run/요약/메모만, 키 기반이라 순서 무관)
+# REAL 값은 JSON1이 15자리로 직렬화해 정확히 복원되지 않고 json_group_array는 순서를 보장하지 않으므로
+# 후보(change_pct)와 뉴스(정렬 필요)는 튜플 행으로 조회
+_RUN_COLUMNS = "run_id, run_date, started_at, ended_at, status, error_message, stats_json, created_at"
+_SUMMARY_COLUMNS = ("run_date, ticker, summary_text, key_points_json, keywords_json, "
+                    "llm_provider, llm_model, created_at")
+_NOTE_COLUMNS = ("run_date, ticker, factual_summary, ai_learning_note, ai_confidence, "
+                 "verification_status, human_note, created_at, updated_at")
+
+_FULL_STUDY_DATA_SQL = f"""
+    SELECT
+        (SELECT {_json_row(_RUN_COLUMNS)} FROM study_runs WHERE run_date = :run_date) AS run_info,
+        (SELECT json_group_object(ticker, json({_json_row(_SUMMARY_COLUMNS)}))
+         FROM summaries WHERE run_date = :run_date) AS summaries,
+        (SELECT json_group_object(ticker, json({_json_row(_NOTE_COLUMNS)}))
+         FROM study_notes WHERE run_date = :run_date) AS study_notes
+"""
+
+
 class StudyDatabase:
     """유목민 공부법 데이터를 관리하는 SQLite 데이터베이스 클래스"""
     
+    # 이 프로세스에서 스키마 초기화를 마친 DB 파일 경로 (같은 파일 재생성 시 CREATE/PRAGMA 생략)
+    _initialized_paths: set = set()
+    _init_lock = threading.Lock()
+    
     def __init__(self, db_path: str = "data/study.db"):
         """
         Args:
@@ -23,16 +259,73 @@ class StudyDatabase:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()  # 스레드별 재사용 연결 (+ bulk() 트랜잭션 표시)
+        # 모든 스레드가 만든 재사용 연결 (close()에서 한꺼번에 닫기 위해 추적)
+        self._connections: set = set()
+        self._connections_lock = threading.Lock()
+        
+        # WAL 모드로 초기화 (프로세스당 파일별 한 번)
+        path_key = str(self.db_path.resolve())
+        with self._init_lock:
+            if path_key not in self._initialized_paths or not self.db_path.exists():
+                self._initialize_database()
+                self._initialized_paths.add(path_key)
+                logger.info(f"StudyDatabase initialized at {self.db_path}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """새 DB 연결 생성 (연결 단위 PRAGMA 적용)"""
+        # 다른 스레드가 쓰는 중이면 즉시 실패하지 않고 최대 30초 대기
+        # 연결을 스레드별로 재사용하므로 statement cache도 넉넉히 (기본 128)
+        # 연결은 만든 스레드에서만 쓰지만, close()가 다른 스레드의 연결도 닫을 수 있도록 check_same_thread 해제
+        conn = sqlite3.connect(str(self.db_path), timeout=30, cached_statements=256,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 딕셔너리처럼 접근 가능
+        # WAL 모드에서는 NORMAL로도 안전 (커밋마다 fsync 하지 않음)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+        return conn
+    
+    def _thread_connection(self) -> sqlite3.Connection:
+        """
+        현재 스레드용 연결 반환 (없으면 생성)
         
-        # WAL 모드로 초기화
-        self._initialize_database()
-        logger.info(f"StudyDatabase initialized at {self.db_path}")
+        호출마다 연결을 열고 닫지 않고 스레드별로 재사용 (PRAGMA 재적용/스키마 파싱 생략,
+        페이지 캐시 유지). sqlite3 연결은 스레드 간 공유하지 않음
+        """
+        conn = getattr(self._local, 'cached', None)
+        with self._connections_lock:
+            if conn is None or conn not in self._connections:
+                # 처음이거나 close()로 이미 닫힌 연결이면 새로 생성
+                conn = self._connect()
+                self._connections.add(conn)
+                self._local.cached = conn
+        return conn
+    
+    def close(self):
+        """
+        모든 스레드의 재사용 연결 종료 (종료 시점 정리용)
+        
+        워커 스레드가 만든 연결도 함께 닫으며, 이후 호출 시에는 스레드별로 새 연결을 엽니다.
+        """
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        self._local.cached = None
+        for conn in connections:
+            conn.close()
     
     @contextmanager
     def get_connection(self):
         """DB 연결 컨텍스트 매니저 (자동 commit/rollback)"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row  # 딕셔너리처럼 접근 가능
+        shared = getattr(self._local, 'conn', None)
+        if shared is not None:
+            # bulk() 안에서는 같은 연결을 재사용 (commit은 bulk 종료 시 한 번)
+            yield shared
+            return
+        
+        conn = self._thread_connection()
         try:
             yield conn
             conn.commit()
@@ -40,8 +333,46 @@ class StudyDatabase:
             conn.rollback()
             logger.error(f"Database transaction failed: {e}")
             raise
+    
+    @contextmanager
+    def bulk(self):
+        """
+        여러 DB 메서드 호출을 하나의 트랜잭션으로 묶는 컨텍스트 매니저
+        
+        같은 스레드에서 호출된 메서드만 공유하며, 중첩 호출 시 바깥 트랜잭션에 합류합니다.
+        
+        Example:
+            with db.bulk():
+                for ticker in tickers:
+                    db.update_candidate_status(run_date, ticker, 'summarized')
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            yield
+            return
+        
+        conn = self._thread_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.conn = conn
+        try:
+            yield
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Database bulk transaction failed: {e}")
+            raise
         finally:
-            conn.close()
+            self._local.conn = None
+    
+    def checkpoint(self):
+        """
+        WAL 내용을 본 DB 파일에 반영하고 WAL 파일을 비움
+        
+        파일 복사 백업/git 커밋 직전에 호출 (study.db만 복사해도 최신 데이터가 담기도록)
+        """
+        with self.get_connection() as conn:
+            busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            if busy:
+                logger.warning(f"WAL checkpoint incomplete (busy): {checkpointed}/{log_frames} frames")
     
     def _initialize_database(self):
         """데이터베이스 스키마 생성 및 WAL 모드 활성화"""
@@ -50,155 +381,59 @@ class StudyDatabase:
             
             # WAL 모드 활성화 (읽기/쓰기 동시 수행)
             cursor.execute("PRAGMA journal_mode=WAL")
+            # 자동 체크포인트 주기 명시 (기본값과 같지만 WAL 파일 크기 상한을 드러내기 위함)
+            cursor.execute("PRAGMA wal_autocheckpoint=1000")
             
-            # 1. study_runs 테이블
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS study_runs (
-                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    run_date TEXT NOT NULL UNIQUE,
-                    started_at TEXT NOT NULL,
-                    ended_at TEXT,
-                    status TEXT NOT NULL,
-                    error_message TEXT,
-                    stats_json TEXT,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # 2. daily_candidates 테이블
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_candidates (
-                    run_date TEXT NOT NULL,
-                    ticker TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    market TEXT,
-                    close_price INTEGER,
-                    change_pct REAL,
-                    volume INTEGER,
-                    value_traded INTEGER,
-                    reason_flag TEXT,
-                    data_collection_status TEXT DEFAULT 'pending',
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (run_date, ticker)
-                )
-            """)
-            
-            # 3. news_items 테이블
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS news_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    run_date TEXT NOT NULL,
-                    ticker TEXT NOT NULL,
-                    provider TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    publisher TEXT,
-                    published_at TEXT,
-                    url TEXT NOT NULL,
-                    snippet TEXT,
-                    raw_text TEXT,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(run_date, ticker, url)
-                )
-            """)
-            
-            # 4. summaries 테이블
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS summaries (
-                    run_date TEXT NOT NULL,
-                    ticker TEXT NOT NULL,
-                    summary_text TEXT NOT NULL,
-                    key_points_json TEXT,
-                    keywords_json TEXT,
-                    llm_provider TEXT DEFAULT 'gemini',
-                    llm_model TEXT,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (run_date, ticker)
-                )
-            """)
-            
-            # 5. study_notes 테이블 (백일공부 학습 메모)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS study_notes (
-                    run_date TEXT NOT NULL,
-                    ticker TEXT NOT NULL,
-                    factual_summary TEXT,
-                    ai_learning_note TEXT,
-                    ai_confidence TEXT CHECK(ai_confidence IN ('high', 'mid', 'low')),
-                    verification_status TEXT,
-                    human_note TEXT,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (run_date, ticker)
-                )
-            """)
-            
-            # 6. ticker_notes 테이블 (범용 메모)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ticker_notes (
-                    ticker TEXT PRIMARY KEY,
-                    note_text TEXT,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # 7. closing_candidates 테이블 (종가매매 후보군)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS closing_candidates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trade_date TEXT NOT NULL,
-                    generated_at TEXT NOT NULL,
-                    rank INTEGER NOT NULL,
-                    ticker TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    score REAL,
-                    reason TEXT,
-                    selection_type TEXT,
-                    market_trend TEXT,
-                    price_at_signal INTEGER,
-                    trading_value INTEGER,
-                    sector TEXT,
-                    raw_payload_json TEXT,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(trade_date, ticker)
-                )
-            """)
-
-            # 8. closing_candidate_results 테이블 (종가매매 성과 평가)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS closing_candidate_results (
-                    candidate_id INTEGER PRIMARY KEY,
-                    ticker TEXT NOT NULL,
-                    eval_date TEXT NOT NULL,
-                    next_open_return_pct REAL,
-                    next_close_return_pct REAL,
-                    next_day_mfe_pct REAL,
-                    next_day_mae_pct REAL,
-                    volume_ratio REAL,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(candidate_id) REFERENCES closing_candidates(id)
+            # 스키마가 최신 버전이면 DDL 전체를 건너뜀
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # 기존 DB 마이그레이션 (인덱스/트리거 생성 전에 테이블 재생성)
+                self._migrate_schema(conn)
+                # 전체 DDL을 단일 트랜잭션으로 실행하고 마지막에 버전 기록
+                cursor.executescript(
+                    f"BEGIN;\n{_SCHEMA_SQL}\nPRAGMA user_version = {SCHEMA_VERSION};\nCOMMIT;"
                 )
-            """)
             
-            # 인덱스 생성
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_candidates_date 
-                ON daily_candidates(run_date)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_news_ticker 
-                ON news_items(ticker, run_date)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_summaries_date 
-                ON summaries(run_date)
-            """)
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_study_notes_date 
-                ON study_notes(run_date)
-            """)
+            # 필요한 테이블만 통계 갱신 (쿼리 플래너가 인덱스를 올바르게 선택하도록)
+            cursor.execute("PRAGMA optimize")
             
             logger.info("Database schema initialized successfully")
     
+    def _migrate_schema(self, conn: sqlite3.Connection):
+        """
+        user_version이 SCHEMA_VERSION보다 낮은 기존 DB의 테이블 재생성 (버전 기록은 스키마 스크립트에서)
+        
+        v1: daily_candidates/summaries/ticker_notes를 WITHOUT ROWID로 재생성
+        v2: trg_study_runs_delete 트리거 제거 (스키마 스크립트에서 DROP)
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        # 이전 버전의 트리거가 재생성 중인 테이블을 참조하면 RENAME이 실패하므로 먼저 제거
+        conn.execute("DROP TRIGGER IF EXISTS trg_study_runs_delete")
+        for table, ddl in _WITHOUT_ROWID_DDL.items():
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if row is None or 'WITHOUT ROWID' in row[0].upper():
+                continue
+            columns = ', '.join(info[1] for info in conn.execute(f"PRAGMA table_info({table})"))
+            key_filter = ' AND '.join(f"{key} IS NOT NULL" for key in _WITHOUT_ROWID_KEYS[table])
+            # PK가 NULL인 행은 새 테이블에 넣을 수 없으므로 복사 전에 백업 테이블로 옮겨 보존
+            null_rows = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE NOT ({key_filter})"
+            ).fetchone()[0]
+            if null_rows:
+                backup = f"{table}_null_key_backup"
+                conn.execute(f"CREATE TABLE {backup} AS SELECT * FROM {table} WHERE NOT ({key_filter})")
+                logger.warning(f"{table}: PK가 NULL인 {null_rows}개 행을 {backup} 테이블로 백업 후 제외")
+            conn.execute(ddl.format(name=f"{table}_new"))
+            conn.execute(
+                f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table} WHERE {key_filter}"
+            )
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            logger.info(f"{table} 테이블을 WITHOUT ROWID로 재생성 완료")
+        conn.commit()
+    
     # ==================== Run 관리 ====================
     
     def start_run(self, run_date: str) -> int:
@@ -211,7 +446,8 @@ class StudyDatabase:
         Returns:
             run_id
         """
-        with self.get_connection() as conn:
+        # 기존 run 삭제와 새 run 생성을 하나의 트랜잭션으로 처리
+        with self.bulk(), self.get_connection() as conn:
             cursor = conn.cursor()
             
             # 기존 run 확인
@@ -227,10 +463,10 @@ class StudyDatabase:
                 self.delete_run(run_date)
             
             # 새 run 생성
-            cursor.execute("""
+            cursor.execute(f"""
                 INSERT INTO study_runs (run_date, started_at, status)
-                VALUES (?, ?, 'running')
-            """, (run_date, datetime.now().isoformat()))
+                VALUES (?, {_SQL_NOW}, 'running')
+            """, (run_date,))
             
             run_id = cursor.lastrowid
             logger.info(f"Started new study run: {run_date} (run_id={run_id})")
@@ -249,15 +485,14 @@ class StudyDatabase:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 UPDATE study_runs
-                SET ended_at = ?, status = ?, error_message = ?, stats_json = ?
+                SET ended_at = {_SQL_NOW}, status = ?, error_message = ?, stats_json = ?
                 WHERE run_date = ?
             """, (
-                datetime.now().isoformat(),
                 status,
                 error_message,
-                json.dumps(stats) if stats else None,
+                json.dumps(stats, separators=(',', ':'), ensure_ascii=False) if stats else None,
                 run_date
             ))
             logger.info(f"Ended study run: {run_date} with status '{status}'")
@@ -277,6 +512,7 @@ class StudyDatabase:
         """특정 날짜의 모든 데이터 삭제"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # study_runs 행이 없는 날짜(중단된 실행 등)의 잔여 데이터도 지우도록 자식 테이블을 직접 삭제
             cursor.execute("DELETE FROM daily_candidates WHERE run_date = ?", (run_date,))
             cursor.execute("DELETE FROM news_items WHERE run_date = ?", (run_date,))
             cursor.execute("DELETE FROM summaries WHERE run_date = ?", (run_date,))
@@ -295,41 +531,57 @@ class StudyDatabase:
                 optional keys: market, close_price, change_pct, volume, 
                               value_traded, reason_flag
         """
+        # 필수 키 검사는 트랜잭션 밖에서 한 번에 하고, 통과한 항목만 executemany 한 번으로 삽입
+        valid = []
+        for candidate in candidates:
+            if 'run_date' in candidate and 'ticker' in candidate and 'name' in candidate:
+                valid.append(candidate)
+            else:
+                logger.error(f"Failed to insert candidate {candidate.get('ticker')}: missing required keys")
+
+        rows = [
+            (
+                candidate['run_date'],
+                candidate['ticker'],
+                candidate['name'],
+                candidate.get('market'),
+                candidate.get('close_price'),
+                candidate.get('change_pct'),
+                candidate.get('volume'),
+                candidate.get('value_traded'),
+                candidate.get('reason_flag')
+            )
+            for candidate in valid
+        ]
+
+        if not rows:
+            return
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            for candidate in candidates:
-                try:
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO daily_candidates 
-                        (run_date, ticker, name, market, close_price, change_pct, 
-                         volume, value_traded, reason_flag, data_collection_status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending')
-                    """, (
-                        candidate['run_date'],
-                        candidate['ticker'],
-                        candidate['name'],
-                        candidate.get('market'),
-                        candidate.get('close_price'),
-                        candidate.get('change_pct'),
-                        candidate.get('volume'),
-                        candidate.get('value_traded'),
-                        candidate.get('reason_flag')
-                    ))
-                except Exception as e:
-                    logger.error(f"Failed to insert candidate {candidate.get('ticker')}: {e}")
-            
-            logger.info(f"Inserted {len(candidates)} candidates")
+            cursor.executemany(_SQL_INSERT_CANDIDATE, rows)
+
+            logger.info(f"Inserted {len(rows)} candidates")
     
     def update_candidate_status(self, run_date: str, ticker: str, status: str):
         """후보 종목의 데이터 수집 상태 업데이트"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE daily_candidates
-                SET data_collection_status = ?
-                WHERE run_date = ? AND ticker = ?
-            """, (status, run_date, ticker))
+            cursor.execute(_SQL_UPDATE_STATUS, (status, run_date, ticker))
+    
+    def update_candidate_statuses(self, run_date: str, statuses: Dict[str, str]):
+        """
+        여러 후보 종목의 데이터 수집 상태 일괄 업데이트 (단일 트랜잭션)
+        
+        Args:
+            run_date: YYYYMMDD 형식의 날짜
+            statuses: {ticker: status} 딕셔너리
+        """
+        with self.get_connection() as conn:
+            self._update_statuses(conn.cursor(), run_date, statuses)
+    
+    def _update_statuses(self, cursor, run_date: str, statuses: Dict[str, str]):
+        cursor.executemany(_SQL_UPDATE_STATUS, [(status, run_date, ticker) for ticker, status in statuses.items()])
     
     def get_candidates(self, run_date: str, status: Optional[str] = None) -> List[Dict]:
         """
@@ -358,7 +610,25 @@ class StudyDatabase:
                     ORDER BY change_pct DESC
                 """, (run_date,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
+    
+    def get_top_candidates(self, run_date: str, limit: int = 5) -> List[Dict]:
+        """
+        등락률 상위 후보 종목 조회 (알림용, 필요한 컬럼만 SQL LIMIT으로)
+        
+        Args:
+            run_date: YYYYMMDD 형식의 날짜
+            limit: 최대 개수
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT ticker, name, change_pct, reason_flag FROM daily_candidates
+                WHERE run_date = ?
+                ORDER BY change_pct DESC
+                LIMIT ?
+            """, (run_date, limit))
+            return _fetch_dicts(cursor)
     
     # ==================== News 관리 ====================
     
@@ -371,35 +641,54 @@ class StudyDatabase:
                 required keys: run_date, ticker, provider, title, url
                 optional keys: publisher, published_at, snippet, raw_text
         """
-        inserted_count = 0
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            for news in news_items:
-                try:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO news_items
-                        (run_date, ticker, provider, title, publisher, 
-                         published_at, url, snippet, raw_text)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        news['run_date'],
-                        news['ticker'],
-                        news['provider'],
-                        news['title'],
-                        news.get('publisher'),
-                        news.get('published_at'),
-                        news['url'],
-                        news.get('snippet'),
-                        news.get('raw_text')
-                    ))
-                    if cursor.rowcount > 0:
-                        inserted_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to insert news for {news.get('ticker')}: {e}")
-            
+        # 쓰기 잠금을 트랜잭션 시작 시점에 확보 (BEGIN IMMEDIATE, 중간 잠금 승격 실패 방지)
+        with self.bulk(), self.get_connection() as conn:
+            inserted_count = self._insert_news_rows(conn.cursor(), news_items)
             logger.info(f"Inserted {inserted_count} news items (duplicates ignored)")
     
+    def save_news_results(self, run_date: str, news_items: List[Dict],
+                          statuses: Dict[str, str]):
+        """
+        뉴스 수집 결과(뉴스 아이템 + 후보 상태)를 단일 트랜잭션으로 저장
+        
+        Args:
+            run_date: YYYYMMDD 형식의 날짜
+            news_items: insert_news_items와 동일한 형식의 뉴스 리스트
+            statuses: {ticker: status} 딕셔너리
+        """
+        with self.bulk(), self.get_connection() as conn:
+            cursor = conn.cursor()
+            inserted_count = self._insert_news_rows(cursor, news_items)
+            self._update_statuses(cursor, run_date, statuses)
+            logger.info(f"Inserted {inserted_count} news items (duplicates ignored), "
+                        f"updated {len(statuses)} candidate statuses")
+    
+    def _insert_news_rows(self, cursor, news_items: List[Dict]) -> int:
+        # 필수 키가 빠진 항목만 걸러내고 나머지는 executemany 한 번으로 삽입
+        rows = []
+        for news in news_items:
+            try:
+                rows.append((
+                    news['run_date'],
+                    news['ticker'],
+                    news['provider'],
+                    news['title'],
+                    news.get('publisher'),
+                    news.get('published_at'),
+                    news['url'],
+                    news.get('snippet'),
+                    news.get('raw_text')
+                ))
+            except Exception as e:
+                logger.error(f"Failed to insert news for {news.get('ticker')}: {e}")
+        
+        if not rows:
+            return 0
+        
+        cursor.executemany(_SQL_INSERT_NEWS, rows)
+        # executemany의 rowcount는 실제 삽입된(무시되지 않은) 행 수의 합계
+        return cursor.rowcount
+    
     def get_news_items(self, run_date: str, ticker: Optional[str] = None) -> List[Dict]:
         """
         뉴스 아이템 조회
@@ -427,7 +716,19 @@ class StudyDatabase:
                     ORDER BY ticker, published_at DESC
                 """, (run_date,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
+    
+    def get_news_items_by_run(self, run_date: str) -> Dict[str, List[Dict]]:
+        """
+        특정 날짜의 뉴스 아이템을 한 번에 조회해 종목별로 그룹화
+        
+        Returns:
+            {ticker: [뉴스 딕셔너리, ...]} (종목별 published_at 내림차순)
+        """
+        news_by_ticker = {}
+        for news in self.get_news_items(run_date):
+            news_by_ticker.setdefault(news['ticker'], []).append(news)
+        return news_by_ticker
     
     # ==================== Summaries 관리 ====================
     
@@ -440,23 +741,33 @@ class StudyDatabase:
                 required keys: run_date, ticker, summary_text
                 optional keys: key_points_json, keywords_json, llm_provider, llm_model
         """
+        self.insert_summaries([summary])
+        logger.debug(f"Inserted summary for {summary['ticker']}")
+    
+    def insert_summaries(self, summaries: List[Dict]):
+        """
+        LLM 요약 일괄 삽입 (단일 트랜잭션, executemany)
+        
+        Args:
+            summaries: insert_summary와 동일한 형식의 딕셔너리 리스트
+        """
+        if not summaries:
+            return
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO summaries
-                (run_date, ticker, summary_text, key_points_json, 
-                 keywords_json, llm_provider, llm_model)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                summary['run_date'],
-                summary['ticker'],
-                summary['summary_text'],
-                summary.get('key_points_json'),
-                summary.get('keywords_json'),
-                summary.get('llm_provider', 'gemini'),
-                summary.get('llm_model')
-            ))
-            logger.debug(f"Inserted summary for {summary['ticker']}")
+            cursor.executemany(_SQL_INSERT_SUMMARY, [
+                (
+                    summary['run_date'],
+                    summary['ticker'],
+                    summary['summary_text'],
+                    summary.get('key_points_json'),
+                    summary.get('keywords_json'),
+                    summary.get('llm_provider', 'gemini'),
+                    summary.get('llm_model')
+                )
+                for summary in summaries
+            ])
     
     def get_summary(self, run_date: str, ticker: str) -> Optional[Dict]:
         """특정 종목의 요약 조회"""
@@ -471,7 +782,28 @@ class StudyDatabase:
     
     def has_summary(self, run_date: str, ticker: str) -> bool:
         """요약 존재 여부 확인 (캐싱용)"""
-        return self.get_summary(run_date, ticker) is not None
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM summaries WHERE run_date = ? AND ticker = ?",
+                (run_date, ticker)
+            ).fetchone() is not None
+    
+    def existing_summary_tickers(self, run_date: str) -> set:
+        """요약이 이미 있는 종목코드 집합 (has_summary 반복 호출 대신 한 번에 조회)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT ticker FROM summaries WHERE run_date = ?", (run_date,))
+            return {row['ticker'] for row in cursor.fetchall()}
+    
+    def get_summary_texts(self, run_date: str) -> Dict[str, str]:
+        """특정 날짜의 {ticker: summary_text} (요약 본문만 필요한 경우용)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT ticker, summary_text FROM summaries WHERE run_date = ?",
+                (run_date,)
+            )
+            return {row['ticker']: row['summary_text'] for row in cursor.fetchall()}
     
     # ==================== Study Notes 관리 (백일공부용) ====================
     
@@ -485,24 +817,33 @@ class StudyDatabase:
                 optional keys: factual_summary, ai_learning_note, ai_confidence,
                               verification_status, human_note
         """
+        self.insert_study_notes([note])
+        logger.debug(f"Inserted study note for {note['ticker']}")
+    
+    def insert_study_notes(self, notes: List[Dict]):
+        """
+        학습 메모 일괄 삽입 (단일 트랜잭션, executemany)
+        
+        Args:
+            notes: insert_study_note와 동일한 형식의 딕셔너리 리스트
+        """
+        if not notes:
+            return
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO study_notes
-                (run_date, ticker, factual_summary, ai_learning_note, 
-                 ai_confidence, verification_status, human_note, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                note['run_date'],
-                note['ticker'],
-                note.get('factual_summary'),
-                note.get('ai_learning_note'),
-                note.get('ai_confidence'),
-                note.get('verification_status'),
-                note.get('human_note'),
-                datetime.now().isoformat()
-            ))
-            logger.debug(f"Inserted study note for {note['ticker']}")
+            cursor.executemany(_SQL_INSERT_STUDY_NOTE, [
+                (
+                    note['run_date'],
+                    note['ticker'],
+                    note.get('factual_summary'),
+                    note.get('ai_learning_note'),
+                    note.get('ai_confidence'),
+                    note.get('verification_status'),
+                    note.get('human_note')
+                )
+                for note in notes
+            ])
     
     def get_study_note(self, run_date: str, ticker: str) -> Optional[Dict]:
         """특정 종목의 학습 메모 조회"""
@@ -517,29 +858,88 @@ class StudyDatabase:
     
     def has_study_note(self, run_date: str, ticker: str) -> bool:
         """학습 메모 존재 여부 확인"""
-        return self.get_study_note(run_date, ticker) is not None
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM study_notes WHERE run_date = ? AND ticker = ?",
+                (run_date, ticker)
+            ).fetchone() is not None
+    
+    def existing_note_tickers(self, run_date: str) -> set:
+        """학습 메모가 이미 있는 종목코드 집합"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT ticker FROM study_notes WHERE run_date = ?", (run_date,))
+            return {row['ticker'] for row in cursor.fetchall()}
     
     def update_human_note(self, run_date: str, ticker: str, human_note: str):
         """인간 메모 업데이트"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 UPDATE study_notes
-                SET human_note = ?, updated_at = ?
+                SET human_note = ?, updated_at = {_SQL_NOW}
                 WHERE run_date = ? AND ticker = ?
-            """, (human_note, datetime.now().isoformat(), run_date, ticker))
+            """, (human_note, run_date, ticker))
             logger.info(f"Updated human note for {ticker} on {run_date}")
     
+    # ==================== LLM 캐시 관리 ====================
+    
+    def get_llm_cache(self, content_hashes: List[str],
+                      max_age_days: Optional[int] = None) -> Dict[str, str]:
+        """
+        내용 해시로 캐시된 LLM 응답 조회
+        
+        Args:
+            content_hashes: 조회할 해시 리스트
+            max_age_days: 지정하면 이 일수보다 오래된 캐시는 무시
+        
+        Returns:
+            {content_hash: response_text} (캐시에 있는 항목만)
+        """
+        if not content_hashes:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(content_hashes))
+            params = list(content_hashes)
+            age_filter = ''
+            if max_age_days is not None:
+                age_filter = "AND created_at >= datetime('now', ?)"
+                params.append(f'-{int(max_age_days)} days')
+            cursor.execute(f"""
+                SELECT content_hash, response_text FROM llm_cache
+                WHERE content_hash IN ({placeholders}) {age_filter}
+            """, params)
+            return {row['content_hash']: row['response_text'] for row in cursor.fetchall()}
+    
+    def put_llm_cache(self, entries: Dict[str, str], llm_model: Optional[str] = None):
+        """
+        LLM 응답 캐시 저장
+        
+        Args:
+            entries: {content_hash: response_text} 딕셔너리
+            llm_model: 응답을 생성한 모델명 (옵션)
+        """
+        if not entries:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO llm_cache (content_hash, response_text, llm_model)
+                VALUES (?, ?, ?)
+            """, [(h, text, llm_model) for h, text in entries.items()])
+            logger.debug(f"Cached {len(entries)} LLM responses")
+    
     # ==================== Notes 관리 ====================
     
     def save_note(self, ticker: str, note_text: str):
         """종목 메모 저장"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 INSERT OR REPLACE INTO ticker_notes (ticker, note_text, updated_at)
-                VALUES (?, ?, ?)
-            """, (ticker, note_text, datetime.now().isoformat()))
+                VALUES (?, ?, {_SQL_NOW})
+            """, (ticker, note_text))
             logger.info(f"Saved note for {ticker}")
     
     def get_note(self, ticker: str) -> Optional[str]:
@@ -568,54 +968,29 @@ class StudyDatabase:
             }
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Run 정보
-            cursor.execute("SELECT * FROM study_runs WHERE run_date = ?", (run_date,))
-            run_row = cursor.fetchone()
-            run_info = dict(run_row) if run_row else None
+            row = conn.execute(_FULL_STUDY_DATA_SQL, {'run_date': run_date}).fetchone()
             
             # 후보 종목
-            cursor.execute("""
+            candidates = _fetch_dicts(conn.execute("""
                 SELECT * FROM daily_candidates WHERE run_date = ?
                 ORDER BY change_pct DESC
-            """, (run_date,))
-            candidates = [dict(row) for row in cursor.fetchall()]
+            """, (run_date,)))
             
             # 뉴스 (ticker별로 그룹화)
-            cursor.execute("""
+            news_by_ticker: Dict[str, List[Dict]] = {}
+            for item in _fetch_dicts(conn.execute("""
                 SELECT * FROM news_items WHERE run_date = ?
                 ORDER BY ticker, published_at DESC
-            """, (run_date,))
-            news_rows = cursor.fetchall()
-            news_by_ticker = {}
-            for row in news_rows:
-                ticker = row['ticker']
-                if ticker not in news_by_ticker:
-                    news_by_ticker[ticker] = []
-                news_by_ticker[ticker].append(dict(row))
-            
-            # 요약 (ticker별로 그룹화)
-            cursor.execute("""
-                SELECT * FROM summaries WHERE run_date = ?
-            """, (run_date,))
-            summary_rows = cursor.fetchall()
-            summaries_by_ticker = {row['ticker']: dict(row) for row in summary_rows}
-            
-            # 학습 메모 (ticker별로 그룹화)
-            cursor.execute("""
-                SELECT * FROM study_notes WHERE run_date = ?
-            """, (run_date,))
-            note_rows = cursor.fetchall()
-            notes_by_ticker = {row['ticker']: dict(row) for row in note_rows}
-            
-            return {
-                'run_info': run_info,
-                'candidates': candidates,
-                'news': news_by_ticker,
-                'summaries': summaries_by_ticker,
-                'study_notes': notes_by_ticker
-            }
+            """, (run_date,))):
+                news_by_ticker.setdefault(item['ticker'], []).append(item)
+        
+        return {
+            'run_info': json.loads(row['run_info']) if row['run_info'] else None,
+            'candidates': candidates,
+            'news': news_by_ticker,
+            'summaries': json.loads(row['summaries']),
+            'study_notes': json.loads(row['study_notes'])
+        }
     
     def get_all_run_dates(self, limit: int = 100) -> List[str]:
         """모든 run 날짜 조회 (최신순)"""
@@ -630,7 +1005,7 @@ class StudyDatabase:
     
     def get_ticker_frequency(self, days: int = 100) -> List[Dict]:
         """
-        종목별 등장 빈도 분석 (최근 N일)
+        종목별 등장 빈도 분석 (최근 N회 run 기준, 휴장일 제외라 달력 일수와 다름)
         
         Returns:
             [{'ticker': '...', 'name': '...', 'count': N}, ...]
@@ -638,17 +1013,17 @@ class StudyDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT ticker, name, COUNT(*) as count
-                FROM daily_candidates
-                WHERE run_date IN (
+                SELECT c.ticker, c.name, COUNT(*) as count
+                FROM (
                     SELECT run_date FROM study_runs
                     ORDER BY run_date DESC
                     LIMIT ?
-                )
-                GROUP BY ticker
+                ) r
+                JOIN daily_candidates c ON c.run_date = r.run_date
+                GROUP BY c.ticker
                 ORDER BY count DESC
             """, (days,))
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
 
     # ==================== Closing Price Strategy 관리 ====================
 
@@ -677,7 +1052,7 @@ class StudyDatabase:
                     candidate.get('price_at_signal'),
                     candidate.get('trading_value'),
                     candidate.get('sector'),
-                    json.dumps(candidate.get('raw_payload_json', {}), ensure_ascii=False)
+                    json.dumps(candidate.get('raw_payload_json', {}), separators=(',', ':'), ensure_ascii=False)
                 ))
                 logger.debug(f"Inserted closing candidate: {candidate['ticker']}")
             except Exception as e:
@@ -692,7 +1067,7 @@ class StudyDatabase:
                 WHERE trade_date = ?
                 ORDER BY rank ASC
             """, (trade_date,))
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
 
     def insert_closing_result(self, result: Dict):
         """
@@ -701,11 +1076,11 @@ class StudyDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute("""
+                cursor.execute(f"""
                     INSERT OR REPLACE INTO closing_candidate_results
                     (candidate_id, ticker, eval_date, next_open_return_pct, next_close_return_pct, 
                      next_day_mfe_pct, next_day_mae_pct, volume_ratio, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, {_SQL_NOW})
                 """, (
                     result['candidate_id'],
                     result['ticker'],
@@ -714,8 +1089,7 @@ class StudyDatabase:
                     result.get('next_close_return_pct'),
                     result.get('next_day_mfe_pct'),
                     result.get('next_day_mae_pct'),
-                    result.get('volume_ratio'),
-                    datetime.now().isoformat()
+                    result.get('volume_ratio')
                 ))
                 logger.debug(f"Inserted closing result for candidate_id: {result['candidate_id']}")
             except Exception as e:
@@ -724,8 +1098,16 @@ class StudyDatabase:
 
 # ==================== 헬퍼 함수 ====================
 
+_instances: Dict[str, StudyDatabase] = {}
+_instances_lock = threading.Lock()
+
+
 def get_study_db() -> StudyDatabase:
-    """StudyDatabase 싱글톤 인스턴스 반환"""
+    """StudyDatabase 싱글톤 인스턴스 반환 (STUDY_DB_PATH별로 하나)"""
     import os
     db_path = os.getenv('STUDY_DB_PATH', 'data/study.db')
-    return StudyDatabase(db_path)
+    with _instances_lock:
+        db = _instances.get(db_path)
+        if db is None:
+            db = _instances[db_path] = StudyDatabase(db_path)
+        return db
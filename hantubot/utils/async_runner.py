@@ -0,0 +1,22 @@
+# hantubot_prod/hantubot/utils/async_runner.py
+"""
+동기 코드에서 코루틴을 실행하기 위한 헬퍼
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine
+
+
+def run_coroutine(coro: Coroutine) -> Any:
+    """
+    코루틴을 동기적으로 실행하고 결과를 반환합니다.
+    
+    엔진의 이벤트 루프 안에서 호출된 경우(asyncio.run 불가) 별도 스레드에서 실행합니다.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
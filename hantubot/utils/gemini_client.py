@@ -0,0 +1,225 @@
+# hantubot_prod/hantubot/utils/gemini_client.py
+"""
+Gemini LLM 공통 헬퍼
+- 프로세스 단위 설정/모델 재사용
+- 동시 배치 실행 (동시 호출 수 제한)
+- 분당 호출 수/토큰 수 제한 (프로세스 공용 슬라이딩 윈도우)
+- 스트리밍 응답의 JSON 멤버 단위 파싱
+- 응답 캐시 키 생성
+"""
+import os
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Callable, Deque, Iterable, Iterator, Tuple, Any
+
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+from hantubot.reporting.logger import get_logger
+from hantubot.utils.async_runner import run_coroutine
+from hantubot.utils.json_utils import loads_json
+
+logger = get_logger(__name__)
+
+# 스트리밍 JSON 파서가 확인해야 하는 구조 문자
+_JSON_SPECIAL_RE = re.compile(r'[{}\[\]",\\]')
+
+# JSON 모드 출력 (코드펜스/설명문 없이 JSON만 생성하도록 강제)
+# 종목코드가 동적 키라 response_schema는 지정하지 않음 (Gemini 스키마는 additionalProperties 미지원)
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Gemini 설정은 프로세스당 한 번만 (configure는 전역 클라이언트를 재생성함)
+_gemini_configured = False
+_gemini_models: Dict[str, Any] = {}
+
+
+class GeminiLimiter:
+    """
+    Gemini 분당 호출 수(GEMINI_RPM) + 분당 토큰 수(GEMINI_TPM) 제한 (슬라이딩 윈도우)
+    
+    프로세스에 하나만 두고 모든 단계/워커 스레드가 공유 (요약 → 학습 메모처럼 연달아 실행되는
+    단계도 같은 창을 씀). 토큰 수는 프롬프트 길이로 추정 (len(prompt) // 4)
+    """
+    
+    def __init__(self, period: float = 60.0):
+        self.period = period
+        self._calls: Deque[Tuple[float, int]] = deque()  # (호출 시각, 추정 토큰 수)
+        self._tokens = 0
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: int, rpm: int, tpm: int) -> float:
+        """한도 안이면 호출을 기록하고 0, 아니면 가장 오래된 호출이 창에서 빠질 때까지 남은 초"""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0][0] >= self.period:
+                self._tokens -= self._calls.popleft()[1]
+            # 프롬프트 하나가 TPM보다 커도 창이 비면 호출할 수 있도록 상한 적용
+            tokens = min(tokens, tpm)
+            if len(self._calls) < rpm and self._tokens + tokens <= tpm:
+                self._calls.append((now, tokens))
+                self._tokens += tokens
+                return 0.0
+            return max(0.01, self.period - (now - self._calls[0][0]))
+    
+    def acquire(self, tokens: int = 0):
+        """호출 전 한도 확인 (초과 시 현재 스레드에서 대기)"""
+        rpm = max(1, int(os.getenv('GEMINI_RPM', '10')))
+        tpm = max(1, int(os.getenv('GEMINI_TPM', '1000000')))
+        while True:
+            wait = self._reserve(tokens, rpm, tpm)
+            if wait <= 0:
+                return
+            logger.warning(f"[Gemini] 호출 한도 도달 (분당 {rpm}회/{tpm}토큰). {wait:.2f}초 대기 중...")
+            time.sleep(wait)
+
+
+_gemini_limiter = GeminiLimiter()
+
+
+def ensure_gemini() -> bool:
+    """GEMINI_API_KEY로 genai를 최초 1회 설정. 키가 없으면 False"""
+    global _gemini_configured
+    if _gemini_configured:
+        return True
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return False
+    genai.configure(api_key=api_key)
+    _gemini_configured = True
+    return True
+
+
+def get_gemini_model(model_name: str):
+    """GenerativeModel 인스턴스를 모델명별로 재사용"""
+    model = _gemini_models.get(model_name)
+    if model is None:
+        model = _gemini_models[model_name] = genai.GenerativeModel(model_name)
+    return model
+
+
+def run_llm_batches(batches: List[List[Dict]], worker: Callable[[List[Dict]], Dict]) -> List:
+    """
+    LLM 배치 호출을 동시 실행 (LLM_CONCURRENCY로 동시 호출 수 제한)
+    
+    분당 호출/토큰 수는 워커 안의 stream_text가 공용 GeminiLimiter로 제한합니다.
+    
+    Returns:
+        배치 순서대로 worker 반환값 또는 발생한 예외
+    """
+    concurrency = max(1, int(os.getenv('LLM_CONCURRENCY', '4')))
+    
+    async def run_all():
+        sem = asyncio.Semaphore(concurrency)
+        done = 0
+        
+        async def run_one(batch):
+            nonlocal done
+            async with sem:
+                started = time.monotonic()
+                try:
+                    return await asyncio.to_thread(worker, batch)
+                finally:
+                    # 완료 순서대로 진행 상황 기록 (프롬프트 구성도 워커 안에서 병렬로 진행됨)
+                    # 배치 크기별 소요 시간은 LLM_BATCH_SIZE/LLM_MAX_PROMPT_CHARS 튜닝에 사용
+                    done += 1
+                    logger.info(f"LLM 배치 {done}/{len(batches)} 완료 "
+                                f"({len(batch)}종목, {time.monotonic() - started:.1f}초)")
+        
+        return await asyncio.gather(*(run_one(b) for b in batches), return_exceptions=True)
+    
+    return run_coroutine(run_all())
+
+
+def iter_json_members(chunks: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """
+    스트리밍 응답 텍스트에서 최상위 JSON 객체의 멤버("key": value)를 완성되는 즉시 반환
+    
+    첫 '{' 이전의 텍스트(```json 등)는 무시하며, 파싱할 수 없는 멤버는 건너뜁니다.
+    """
+    buf = ''
+    pos = 0
+    depth = 0
+    in_string = False
+    member_start = None
+    
+    for chunk in chunks:
+        buf += chunk
+        while True:
+            # 구조 문자까지 한 번에 건너뜀 (문자 단위 파이썬 루프 회피)
+            match = _JSON_SPECIAL_RE.search(buf, pos)
+            if not match:
+                pos = len(buf)
+                break
+            ch = match.group()
+            pos = match.end()
+            
+            if depth == 0:
+                if ch == '{':
+                    depth = 1
+                    member_start = pos
+                continue
+            
+            if in_string:
+                if ch == '\\':
+                    if pos >= len(buf):
+                        # 이스케이프 대상 문자가 다음 조각에 있음
+                        pos -= 1
+                        break
+                    pos += 1
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in '{[':
+                depth += 1
+            elif ch in '}]' and depth > 1:
+                depth -= 1
+            elif depth == 1 and ch in ',}':
+                # 최상위 멤버 하나 완성
+                member = buf[member_start:pos - 1].strip()
+                member_start = pos
+                if member:
+                    try:
+                        yield from loads_json('{' + member + '}').items()
+                    except ValueError:
+                        logger.debug(f"JSON 멤버 파싱 실패 (건너뜀): {member[:80]}")
+                if ch == '}':
+                    return
+
+
+def stream_text(model, prompt: str, max_retries: int = 3) -> Iterator[str]:
+    """
+    Gemini 스트리밍 호출 결과를 텍스트 조각 단위로 반환
+    
+    429/503은 지수 백오프(+지터) 후 재시도. 이미 조각을 내보낸 뒤의 오류는
+    중복 저장을 막기 위해 재시도하지 않고 그대로 올림
+    """
+    # 토큰 수는 문자 4개당 1토큰으로 추정
+    est_tokens = len(prompt) // 4
+    for attempt in range(max_retries):
+        started = False
+        _gemini_limiter.acquire(est_tokens)
+        try:
+            for chunk in model.generate_content(prompt, stream=True,
+                                                generation_config=_JSON_GENERATION_CONFIG):
+                started = True
+                yield chunk.text
+            return
+        except (ResourceExhausted, ServiceUnavailable) as e:
+            if started or attempt == max_retries - 1:
+                raise
+            wait_time = min(60.0, 2 ** (attempt + 1) + random.random())
+            logger.warning(f"Gemini 호출 제한/일시 오류 - {wait_time:.1f}초 후 재시도 "
+                           f"({attempt + 1}/{max_retries}): {e}")
+            time.sleep(wait_time)
+
+
+def content_hash(kind: str, ticker: str, news_texts: str) -> str:
+    """LLM 응답 캐시 키 (응답 종류 + 종목코드 + 프롬프트에 들어가는 뉴스 내용)"""
+    payload = f"{kind}\n{ticker}\n{news_texts}".encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
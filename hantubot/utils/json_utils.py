@@ -0,0 +1,22 @@
+# hantubot_prod/hantubot/utils/json_utils.py
+"""
+JSON 파싱 헬퍼
+- orjson이 설치되어 있으면 사용 (선택 의존성)
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """orjson이 있으면 사용하고, 실패하거나(NaN 등) 없으면 표준 json으로 파싱"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
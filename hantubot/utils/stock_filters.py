@@ -1,4 +1,5 @@
 # hantubot/utils/stock_filters.py
+import re
 
 # 제외할 키워드 목록
 # 대소문자 구분을 위해 일부는 원본, 일부는 대문자로 확인
@@ -17,6 +18,12 @@ EXCLUSION_KEYWORDS = [
     "신주인수권",
 ]
 
+# 전체 조건을 하나의 정규식으로 미리 컴파일 (종목명마다 upper()/키워드 루프 반복 방지)
+# - ETF: 대소문자 무시 / 우선주: 이름 끝이 '우' / 나머지 키워드: 대소문자 구분
+_INELIGIBLE_RE = re.compile(
+    r'(?i:ETF)|우\Z|' + '|'.join(re.escape(keyword) for keyword in EXCLUSION_KEYWORDS)
+)
+
 def is_eligible_stock(stock_name: str) -> bool:
     """
     주어진 종목명이 투자 대상에 적합한 일반 주식인지 확인합니다.
@@ -28,16 +35,5 @@ def is_eligible_stock(stock_name: str) -> bool:
     if not stock_name:
         return False
 
-    name_upper = stock_name.upper()
-
-    if "ETF" in name_upper:
-        return False
-    
-    if name_upper.endswith("우"): # 우선주 (e.g., 삼성전자우)
-        return False
-        
-    for keyword in EXCLUSION_KEYWORDS:
-        if keyword in stock_name:
-            return False
-
-    return True
+    # ETF, 우선주(e.g., 삼성전자우), EXCLUSION_KEYWORDS 중 하나라도 포함되면 제외
+    return _INELIGIBLE_RE.search(stock_name) is None